@@ -0,0 +1,199 @@
+import threading
+import tkinter as tk
+from scripts import metrics, units
+from scripts.city_registry import city_registry
+from scripts import get_weather as weather
+from scripts.weather_record import WeatherRecord
+
+
+# Maximum number of cities shown on the dashboard
+DASHBOARD_MAX_CITIES = 200
+
+# Size of a tile and gap between tiles, in pixels
+TILE_WIDTH = 190
+TILE_HEIGHT = 84
+TILE_GAP = 8
+
+# Interval between two reads of the weather cache, in milliseconds
+POLL_INTERVAL = 1000
+
+# colors
+TILE_BG = "#3A3B3C"
+TILE_STALE_BG = "#2A2B2C"
+TEXT_COLOR = "white"
+MUTED_TEXT_COLOR = "light gray"
+
+
+class Dashboard(tk.Frame):
+    """
+        Shows the weather of many cities at once as tiles drawn on a single Canvas.
+
+        Every tile is a fixed set of canvas items created once and reused. Data changes only mark tiles
+        as dirty; all dirty tiles are redrawn in one after_idle pass, and only the items whose text or
+        color actually changed are reconfigured.
+    """
+
+    def __init__(self, parent, cities=None, *args, **kwargs):
+        """
+            Args:
+                parent (tk.Widget): Parent widget.
+                cities (list): Cities to show. Defaults to the known valid cities.
+        """
+        super().__init__(parent, *args, **kwargs)
+        self.canvas = tk.Canvas(self, bg="#000000", highlightthickness=0)
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        if cities is None:
+            cities = city_registry.cities[:DASHBOARD_MAX_CITIES]
+        self.cities = list(cities)
+        # Cache key of every city, resolved once
+        self.keys = {city: weather.resolve_city(city)[0] for city in self.cities}
+
+        self.tiles = {}
+        self.data = {}
+        self.dirty = set()
+        self.flush_id = None
+        self.poll_id = None
+        self.columns = 0
+
+        for city in self.cities:
+            self.tiles[city] = self.create_tile(city)
+
+        self.canvas.bind("<Configure>", self.on_resize)
+        self.canvas.bind("<MouseWheel>", self.on_mousewheel)
+        units.add_listener(self.on_unit_changed)
+        self.poll()
+        self.fetch_all()
+
+    def create_tile(self, city):
+        """
+            Creates the canvas items of a tile. Items are positioned by layout().
+        """
+        return {
+            'rect': self.canvas.create_rectangle(0, 0, TILE_WIDTH, TILE_HEIGHT, fill=TILE_BG, width=0),
+            'city': self.canvas.create_text(0, 0, text=city, anchor="nw", fill=TEXT_COLOR, font=("Arial", 14, "bold")),
+            'temperature': self.canvas.create_text(0, 0, text="--", anchor="nw", fill=TEXT_COLOR, font=("Arial", 22)),
+            'weather': self.canvas.create_text(0, 0, text="", anchor="ne", fill=MUTED_TEXT_COLOR, font=("Arial", 12)),
+            'drawn': {},
+        }
+
+    def on_resize(self, event):
+        columns = max(1, (event.width + TILE_GAP) // (TILE_WIDTH + TILE_GAP))
+        if columns != self.columns:
+            self.columns = columns
+            self.layout()
+
+    def on_mousewheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        self.canvas.yview_scroll(step, "units")
+
+    def layout(self):
+        """
+            Moves every tile to its place in the grid. Only runs when the number of columns changes.
+        """
+        for i, city in enumerate(self.cities):
+            x = TILE_GAP + (i % self.columns) * (TILE_WIDTH + TILE_GAP)
+            y = TILE_GAP + (i // self.columns) * (TILE_HEIGHT + TILE_GAP)
+            tile = self.tiles[city]
+            self.canvas.coords(tile['rect'], x, y, x + TILE_WIDTH, y + TILE_HEIGHT)
+            self.canvas.coords(tile['city'], x + 10, y + 8)
+            self.canvas.coords(tile['temperature'], x + 10, y + 36)
+            self.canvas.coords(tile['weather'], x + TILE_WIDTH - 10, y + 44)
+
+        rows = (len(self.cities) + self.columns - 1) // self.columns
+        self.canvas.configure(scrollregion=(0, 0, 0, TILE_GAP + rows * (TILE_HEIGHT + TILE_GAP)))
+
+    def update_city(self, city, record):
+        """
+            Records new data for a city and schedules a redraw of its tile.
+
+            Args:
+                city (str): City shown on the dashboard.
+                record (WeatherRecord): Cached weather data of the city.
+        """
+        # Cached records are never modified, so an unchanged record means unchanged data
+        if self.data.get(city) is record:
+            return
+        self.data[city] = record
+        self.dirty.add(city)
+        self.schedule_flush()
+
+    def on_unit_changed(self, unit):
+        """
+            Redraws the temperature of every tile in the new unit, from the data already shown.
+        """
+        self.dirty.update(self.data)
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.flush_id is None:
+            self.flush_id = self.after_idle(self.flush)
+
+    def flush(self):
+        """
+            Redraws the dirty tiles, reconfiguring only the items whose values changed.
+        """
+        self.flush_id = None
+        with metrics.timer("widget_update"):
+            cities = list(self.dirty)
+            records = [self.data[city] for city in cities]
+            # One conversion pass for every dirty tile
+            temperatures = units.convert_many(record.kelvin for record in records)
+            for city, record, temperature in zip(cities, records, temperatures):
+                self.draw_tile(self.tiles[city], self.tile_values(record, temperature))
+            self.dirty.clear()
+
+    def tile_values(self, record, temperature):
+        """
+            Returns the values displayed by a tile for a weather record and its converted temperature.
+        """
+        stale = weather.is_entry_expired(record)
+        return {
+            'temperature': f"{temperature}{units.symbol()}",
+            'weather': record.weather,
+            'fill': TILE_STALE_BG if stale else TILE_BG,
+        }
+
+    def draw_tile(self, tile, values):
+        drawn = tile['drawn']
+        if drawn.get('temperature') != values['temperature']:
+            self.canvas.itemconfigure(tile['temperature'], text=values['temperature'])
+        if drawn.get('weather') != values['weather']:
+            self.canvas.itemconfigure(tile['weather'], text=values['weather'])
+        if drawn.get('fill') != values['fill']:
+            self.canvas.itemconfigure(tile['rect'], fill=values['fill'])
+        tile['drawn'] = values
+
+    def poll(self):
+        """
+            Picks up new data from the in-memory weather cache.
+        """
+        for city, key in self.keys.items():
+            if key is None:
+                continue
+            record = weather.weather_cache.peek(key, disk=False)
+            if isinstance(record, WeatherRecord):
+                self.update_city(city, record)
+        self.poll_id = self.after(POLL_INTERVAL, self.poll)
+
+    def fetch_all(self):
+        """
+            Fills the weather cache for every city in a background thread, as background traffic.
+        """
+        threading.Thread(
+            target=weather.get_weather_many,
+            args=(self.cities,),
+            name="dashboard-fetch",
+            daemon=True,
+        ).start()
+
+    def destroy(self):
+        units.remove_listener(self.on_unit_changed)
+        if self.poll_id is not None:
+            self.after_cancel(self.poll_id)
+        if self.flush_id is not None:
+            self.after_cancel(self.flush_id)
+        super().destroy()
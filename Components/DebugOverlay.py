@@ -0,0 +1,70 @@
+import tkinter as tk
+from scripts import metrics
+
+
+# Interval between two refreshes of the overlay, in milliseconds
+REFRESH_INTERVAL = 500
+
+# Histograms shown in the overlay
+TIMERS = ("cache_lookup", "http_request", "json_parse", "city_file_io", "widget_update")
+
+
+class DebugOverlay(tk.Label):
+    """
+        Small live readout of the hot-path metrics, drawn in the top-right corner of its parent.
+
+        Showing the overlay turns metrics collection on.
+    """
+
+    def __init__(self, parent, *args, **kwargs):
+        super().__init__(
+            parent,
+            *args,
+            bg="#1E1E1E",
+            fg="#9CDCFE",
+            font=("Courier", 11),
+            justify=tk.LEFT,
+            anchor="ne",
+            padx=6,
+            pady=4,
+            **kwargs,
+        )
+        self.refresh_id = None
+
+    def toggle(self, event=None):
+        if self.refresh_id is None:
+            self.show()
+        else:
+            self.hide()
+
+    def show(self):
+        metrics.enable()
+        self.place(relx=1.0, rely=0.0, anchor="ne", x=-5, y=30)
+        self.lift()
+        self.refresh()
+
+    def hide(self):
+        if self.refresh_id is not None:
+            self.after_cancel(self.refresh_id)
+            self.refresh_id = None
+        self.place_forget()
+
+    def refresh(self):
+        """
+            Redraws the overlay text.
+        """
+        lines = []
+        for name in TIMERS:
+            p50, p95 = metrics.percentiles(name)
+            if p50 is not None:
+                lines.append(f"{name:<14} p50 {p50 * 1000:8.2f} ms  p95 {p95 * 1000:8.2f} ms")
+
+        stats = metrics.gauges()
+        lookups = stats.get('hits', 0) + stats.get('misses', 0)
+        if lookups:
+            lines.append(f"cache hit ratio {stats['hits'] / lookups:6.1%}  ({lookups} lookups)")
+        if 'remaining_minute' in stats:
+            lines.append(f"quota left      {stats['remaining_minute']}/min  {stats['remaining_day']}/day")
+
+        self.configure(text="\n".join(lines) or "no samples yet")
+        self.refresh_id = self.after(REFRESH_INTERVAL, self.refresh)
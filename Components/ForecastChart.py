@@ -0,0 +1,165 @@
+import time
+import tkinter as tk
+from scripts import metrics, units
+from scripts.forecast import downsample
+
+
+# Space around the plot area, in pixels
+MARGIN_LEFT = 44
+MARGIN_RIGHT = 10
+MARGIN_TOP = 10
+MARGIN_BOTTOM = 22
+
+# Precipitation shown at full height, at least (in mm per 3 hours)
+MIN_PRECIPITATION_SCALE = 5.0
+
+# colors
+BACKGROUND = "#000000"
+TEMPERATURE_COLOR = "#e46b71"
+PRECIPITATION_COLOR = "#08B6CE"
+LABEL_COLOR = "light gray"
+
+
+class ForecastChart(tk.Canvas):
+    """
+        Temperature line over precipitation bars for a ForecastSeries.
+
+        The series is downsampled to the pixel width of the plot, so the number of canvas items never
+        exceeds the number of pixels. Items are created once and moved on redraw; resizes are
+        coalesced into one after_idle redraw.
+    """
+
+    def __init__(self, parent, height=160, *args, **kwargs):
+        kwargs.setdefault("bg", BACKGROUND)
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(parent, *args, height=height, **kwargs)
+
+        self.series = None
+        self.redraw_id = None
+        self.drawn_size = None
+
+        self.bars = []
+        self.day_labels = []
+        self.temperature_line = self.create_line(0, 0, 0, 0, fill=TEMPERATURE_COLOR, width=2, state=tk.HIDDEN)
+        self.high_label = self.create_text(MARGIN_LEFT - 6, MARGIN_TOP, anchor="ne", fill=LABEL_COLOR, font=("Arial", 10))
+        self.low_label = self.create_text(MARGIN_LEFT - 6, 0, anchor="se", fill=LABEL_COLOR, font=("Arial", 10))
+
+        self.bind("<Configure>", self.on_resize)
+        units.add_listener(self.on_unit_changed)
+
+    def set_series(self, series):
+        """
+            Shows a new forecast.
+
+            Args:
+                series (ForecastSeries): Forecast to draw.
+        """
+        self.series = series
+        self.drawn_size = None
+        self.schedule_redraw()
+
+    def on_resize(self, event):
+        self.schedule_redraw()
+
+    def on_unit_changed(self, unit):
+        self.drawn_size = None
+        self.schedule_redraw()
+
+    def schedule_redraw(self):
+        if self.redraw_id is None:
+            self.redraw_id = self.after_idle(self.redraw)
+
+    def redraw(self):
+        """
+            Moves the chart items to match the current series and size.
+        """
+        self.redraw_id = None
+        size = (self.winfo_width(), self.winfo_height())
+        if self.series is None or size == self.drawn_size:
+            return
+        self.drawn_size = size
+
+        with metrics.timer("widget_update"):
+            self.draw(*size)
+
+    def draw(self, width, height):
+        series = self.series
+        plot_width = max(1, width - MARGIN_LEFT - MARGIN_RIGHT)
+        plot_height = max(1, height - MARGIN_TOP - MARGIN_BOTTOM)
+        bottom = MARGIN_TOP + plot_height
+
+        converted = units.convert_many(series.temperature, rounded=False)
+        temperatures = downsample(converted, plot_width)
+        precipitation = downsample(series.precipitation, plot_width)
+        count = len(temperatures)
+        if count == 0:
+            self.itemconfigure(self.temperature_line, state=tk.HIDDEN)
+            self.resize_pool(self.bars, 0, self.create_bar)
+            self.resize_pool(self.day_labels, 0, self.create_day_label)
+            return
+
+        step = plot_width / count
+        low = min(converted)
+        high = max(converted)
+        span = (high - low) or 1.0
+        rain_scale = max(MIN_PRECIPITATION_SCALE, max(series.precipitation))
+
+        def temperature_y(value):
+            return bottom - (value - low) / span * plot_height
+
+        # Precipitation bars, one per bucket
+        self.resize_pool(self.bars, count, self.create_bar)
+        for i, (bar, (_, _, amount)) in enumerate(zip(self.bars, precipitation)):
+            x = MARGIN_LEFT + i * step
+            self.coords(bar, x, bottom - amount / rain_scale * plot_height, x + max(1, step - 1), bottom)
+
+        # Temperature line, through the low and high of each bucket
+        points = []
+        for i, (_, value_low, value_high) in enumerate(temperatures):
+            x = MARGIN_LEFT + (i + 0.5) * step
+            points.extend((x, temperature_y(value_low)))
+            if value_high != value_low:
+                points.extend((x, temperature_y(value_high)))
+        if len(points) >= 4:
+            self.coords(self.temperature_line, *points)
+            self.itemconfigure(self.temperature_line, state=tk.NORMAL)
+        else:
+            self.itemconfigure(self.temperature_line, state=tk.HIDDEN)
+
+        self.itemconfigure(self.high_label, text=f"{round(high)}°")
+        self.itemconfigure(self.low_label, text=f"{round(low)}°")
+        self.coords(self.low_label, MARGIN_LEFT - 6, bottom)
+
+        # Day names under the first bucket of each day
+        days = []
+        previous_day = None
+        for i, (start, _, _) in enumerate(temperatures):
+            day = time.localtime(series.times[start])
+            if day.tm_yday != previous_day:
+                previous_day = day.tm_yday
+                days.append((MARGIN_LEFT + i * step, time.strftime("%a", day)))
+        self.resize_pool(self.day_labels, len(days), self.create_day_label)
+        for label, (x, text) in zip(self.day_labels, days):
+            self.coords(label, x, bottom + 4)
+            self.itemconfigure(label, text=text)
+
+    def destroy(self):
+        units.remove_listener(self.on_unit_changed)
+        if self.redraw_id is not None:
+            self.after_cancel(self.redraw_id)
+        super().destroy()
+
+    def create_bar(self):
+        return self.create_rectangle(0, 0, 0, 0, fill=PRECIPITATION_COLOR, width=0)
+
+    def create_day_label(self):
+        return self.create_text(0, 0, anchor="nw", fill=LABEL_COLOR, font=("Arial", 10))
+
+    def resize_pool(self, pool, size, create):
+        """
+            Grows or shrinks a list of canvas items to size items, reusing the existing ones.
+        """
+        while len(pool) < size:
+            pool.append(create())
+        while len(pool) > size:
+            self.delete(pool.pop())
@@ -0,0 +1,127 @@
+import os
+from collections import OrderedDict
+from PIL import Image, ImageTk
+
+
+# Directory holding the pre-resized asset pack
+ASSET_PACK_DIR = "Images/pack"
+
+# Every (path, size) pair used by the application, built into the asset pack
+ASSET_SIZES = [
+    ("Images/cloud.png", (65, 39)),
+    ("Images/search.png", (20, 20)),
+    ("Images/sadcloudsprite.png", (420, 300)),
+]
+
+
+def pack_path(path, size, pack_dir=ASSET_PACK_DIR):
+    """
+        Returns the location of an image in the asset pack.
+
+        Args:
+            path (str): Path of the source image.
+            size (tuple): (width, height) of the resized image.
+            pack_dir (str): Directory holding the asset pack.
+
+        Returns:
+            str: Path of the raw RGBA file.
+    """
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(pack_dir, f"{name}_{size[0]}x{size[1]}.rgba")
+
+
+def load_image(path, size, pack_dir=ASSET_PACK_DIR):
+    """
+        Returns a resized PIL image, read from the asset pack when it has been built.
+
+        Pack entries are raw RGBA pixels, so loading them needs neither PNG decoding nor resizing.
+
+        Args:
+            path (str): Path of the source image.
+            size (tuple): (width, height) of the resized image.
+            pack_dir (str): Directory holding the asset pack.
+
+        Returns:
+            PIL.Image.Image: The resized image.
+    """
+    packed = pack_path(path, size, pack_dir)
+    try:
+        with open(packed, 'rb') as reading:
+            return Image.frombytes("RGBA", size, reading.read())
+    except (OSError, ValueError):
+        return Image.open(path).convert("RGBA").resize(size)
+
+
+def build_asset_pack(assets=ASSET_SIZES, pack_dir=ASSET_PACK_DIR):
+    """
+        Decodes and resizes every asset once and writes the raw pixels to the asset pack.
+
+        Args:
+            assets (list): (path, size) pairs to build.
+            pack_dir (str): Directory holding the asset pack.
+    """
+    os.makedirs(pack_dir, exist_ok=True)
+    for path, size in assets:
+        image = Image.open(path).convert("RGBA").resize(size)
+        with open(pack_path(path, size, pack_dir), 'wb') as writing:
+            writing.write(image.tobytes())
+
+
+class ImageCache:
+    """
+        Memoizes PhotoImage objects per (path, size), evicting the least recently used ones.
+
+        Each image is decoded and resized once. Widgets keep a reference to the PhotoImage they show,
+        so evicting it from the cache never blanks an image that is on screen.
+    """
+
+    def __init__(self, max_images=32, pack_dir=ASSET_PACK_DIR):
+        """
+            Args:
+                max_images (int): Maximum number of PhotoImage objects kept.
+                pack_dir (str): Directory holding the asset pack.
+        """
+        self.max_images = max_images
+        self.pack_dir = pack_dir
+        self._photos = OrderedDict()
+
+    def get(self, path, size):
+        """
+            Returns the PhotoImage of an image at a given size.
+
+            Args:
+                path (str): Path of the source image.
+                size (tuple): (width, height) of the resized image.
+
+            Returns:
+                ImageTk.PhotoImage: The image, ready to be used by a widget.
+        """
+        key = (path, size)
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+
+        photo = ImageTk.PhotoImage(load_image(path, size, self.pack_dir))
+        self._photos[key] = photo
+        while len(self._photos) > self.max_images:
+            self._photos.popitem(last=False)
+        return photo
+
+    def preload(self, assets=ASSET_SIZES):
+        """
+            Builds the PhotoImage of every asset ahead of its first use.
+        """
+        for path, size in assets:
+            self.get(path, size)
+
+    def clear(self):
+        self._photos.clear()
+
+
+# Shared image cache. PhotoImage objects need a Tk root, so images are only built on first use.
+image_cache = ImageCache()
+
+
+if __name__ == "__main__":
+    build_asset_pack()
@@ -1,8 +1,12 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-from scripts.valid_cities import get_valid_cities
-from scripts.get_weather import get_weather
+from scripts import units
+from scripts.city_registry import city_registry
+from scripts.get_weather import get_weather, get_forecast, is_city_not_found
+from Components.ForecastChart import ForecastChart
+from Components.SuggestionList import SuggestionList
+from Components.WeatherWorker import WeatherWorker
+from Components.ImageCache import image_cache
 
 
 # colors 
@@ -10,6 +14,9 @@ BLUE_GREEN = '#08B6CE'
 RED_STONE = "#e46b71"
 BALTIC_SEA = "#3A3B3C"
 
+# Interval between checks of the valid cities file for changes, in milliseconds
+CITY_REFRESH_INTERVAL = 5000
+
 class SearchBar(tk.Frame):
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
@@ -19,6 +26,10 @@ class SearchBar(tk.Frame):
 
         self.parent = parent
 
+        # Runs weather lookups off the Tk thread
+        self.weather_worker = WeatherWorker(self)
+        self.forecast_worker = WeatherWorker(self, max_workers=1)
+
         # Entry Frame
         self.entry_frame = tk.Frame(self, bg="gray")
         self.entry_frame.pack(side=tk.TOP, anchor='w', pady=(0, 0))
@@ -28,6 +39,21 @@ class SearchBar(tk.Frame):
         self.suggestion_frame = tk.Frame(self, bg="", width=50, padx=0, pady=0)
         self.configure_listbox()  # Add this line to initialize the listbox
 
+        # Loading indicator shown while a lookup is in flight
+        self.loading_label = tk.Label(
+            self,
+            text="Loading...",
+            bg="#000000",
+            fg="light gray",
+            font=("Arial", 18),
+        )
+
+        # Forecast of the last city found, shown under the search bar
+        self.forecast_chart = ForecastChart(self, height=160, width=900)
+
+        # Weather record of the last result, shown again when the unit changes
+        self.last_record = None
+
 
     def configure_search_entry(self):
         """
@@ -90,8 +116,7 @@ class SearchBar(tk.Frame):
         self.search_entry.insert(0, self.default_text)
 
         # Search Button
-        search_image = Image.open("Images/search.png").resize((20, 20))
-        self.search_photo = ImageTk.PhotoImage(search_image)
+        self.search_photo = image_cache.get("Images/search.png", (20, 20))
         search_button = ttk.Button(
             self.search_bar_frame,
             image=self.search_photo, 
@@ -141,75 +166,68 @@ class SearchBar(tk.Frame):
             Listbox is a list of cities that the user may type in searchbar. The list contains very few cities so far, but
             the user may type any valid city and try to see if there is a weather API for that city.
         """
-        if hasattr(self, "listbox"):
-            self.listbox.destroy()
-
-        self.listbox = tk.Listbox(
+        self.listbox = SuggestionList(
             self.suggestion_frame, 
+            rows=3,
+            on_select=self.fillout,
             bg="#3A3B3C", 
             fg="white", 
             font=("Arial", 22), 
             width=62, 
             borderwidth=0, 
-            height=3
         )
         self.listbox.pack(pady=0, side=tk.LEFT, padx=(80, 0))
 
-        self.cities = get_valid_cities()
-        self.cities.sort()
-        self.update_listbox(self.cities)
-        self.listbox.bind("<<ListboxSelect>>", self.fillout)
+        # The city indexes are loaded on first focus of the search entry, see on_entry_focus_in()
+        self.refresh_id = self.after(CITY_REFRESH_INTERVAL, self.refresh_cities)
+
+    def refresh_cities(self):
+        """
+            Picks up cities added to the valid cities file by other processes.
+        """
+        if city_registry.refresh() and self.suggestion_frame.winfo_ismapped():
+            self.update_listbox(city_registry.suggest(self.search_entry.get()))
+        self.refresh_id = self.after(CITY_REFRESH_INTERVAL, self.refresh_cities)
     
     def switch_to_celsius(self):
-        pass
+        self.switch_unit(units.CELSIUS)
 
     def switch_to_fahrenheit(self):
-        pass
+        self.switch_unit(units.FAHRENHEIT)
 
-    def fillout(self, e):
+    def switch_unit(self, unit):
+        """
+            Shows every temperature in another unit. Converted locally from cached data, without any request.
+        """
+        units.set_display_unit(unit)
+        if self.last_record is not None:
+            print(self.last_record.as_dict())
+
+    def fillout(self, selected_item):
         """
             Allows us to click on cities in listbox and fill out search bar
         """
         self.search_entry.delete(0, tk.END)
-        selected_item = self.listbox.get(self.listbox.curselection())
         self.search_entry.insert(0, selected_item.strip())
 
         search_query = self.search_entry.get()
-        if (
-            search_query.lower() != self.default_text.lower()
-            and search_query.lower() != ""
-        ):
-            result = get_weather(search_query)
-            if result:
-                print(result)
-            else:
-                print("City weather not found")
-                self.city_not_found()
+        self.search(search_query)
 
         self.focus_set()
 
     def update_listbox(self, cities):
         """
-            Updates listbox with passed in cities
+            Updates listbox with passed in cities. Only the visible rows are rendered.
         """
-        self.listbox.delete(0, tk.END)
-        for city in cities:
-            padding = ""
-            self.listbox.insert(tk.END, padding + city)
+        self.listbox.set_items(cities)
 
     def check_listbox(self, e):
         """
             updates listbox with cities that have the characters user has typed.
         """
         user_typed = self.search_entry.get()
-        if user_typed == "":
-            data = self.cities
-        else:
-            data = []
-            for city in self.cities:
-                if city.lower().startswith(user_typed.lower()):
-                    data.append(city)
-        self.update_listbox(data)
+        # Debounced so that only the latest query renders while the user types quickly
+        self.listbox.schedule(lambda: city_registry.suggest(user_typed))
 
     def load_and_resize_cloud(self):
         """
@@ -218,8 +236,7 @@ class SearchBar(tk.Frame):
         style = ttk.Style()
         style.configure("Custom.TLabel", relief="solid", bordercolor="light gray")
 
-        image = Image.open("Images/cloud.png").resize((65, 39))
-        photo = ImageTk.PhotoImage(image)
+        photo = image_cache.get("Images/cloud.png", (65, 39))
         self.image_label = ttk.Label(
             self.entry_frame,
             image=photo, 
@@ -240,7 +257,10 @@ class SearchBar(tk.Frame):
         
         self.suggestion_frame.pack(pady=(0, 5), anchor="w", padx=0)
 
-        self.configure_listbox()
+        # First use of the city list: the prefix index is loaded now, the typo-tolerant one in the background
+        if city_registry.fuzzy_index is None:
+            city_registry.build_fuzzy_index(background=True)
+        self.update_listbox(city_registry.suggest(self.search_entry.get()))
 
         self.style.configure("Custom.TLabel", bordercolor="#3A3B3C", relief="solid")
         self.image_label.configure(style="Custom.TLabel")
@@ -268,16 +288,7 @@ class SearchBar(tk.Frame):
             Handle the return key event of the search entry.
         """
         search_query = self.search_entry.get()
-        if (
-            search_query.lower() != self.default_text.lower()
-            and search_query.lower() != ""
-        ):
-            result = get_weather(search_query)
-            if result:
-                print(result)
-            else:
-                print("City weather not found")
-                self.city_not_found()
+        self.search(search_query)
 
         self.focus_set()
 
@@ -286,18 +297,80 @@ class SearchBar(tk.Frame):
             Handle the click event of the search button.
         """
         search_query = self.search_entry.get()
+        self.search(search_query)
+
+        self.focus_set()
+
+    def search(self, search_query):
+        """
+            Starts a weather lookup in the background, superseding any lookup still in flight.
+        """
         if (
             search_query.lower() != self.default_text.lower()
             and search_query.lower() != ""
         ):
-            result = get_weather(search_query)
-            if result:
-                print(result)
-            else:
-                print("City weather not found")
-                self.city_not_found()
+            if hasattr(self, "error_frame"):
+                self.error_frame.destroy()
 
-        self.focus_set()
+            self.forecast_worker.cancel()
+            self.forecast_chart.pack_forget()
+            self.loading_label.pack(pady=(10, 0))
+            self.weather_worker.submit(search_query, self.on_weather_result, lookup=self.lookup_weather)
+
+    def lookup_weather(self, search_query):
+        """
+            Looks up the weather of the query. Runs on a worker thread.
+
+            Only if the query itself is not found is it corrected to the closest known city and looked
+            up again, so that real cities spelled close to a listed one can still be found. Network
+            errors and rate limits never lead to another city's weather.
+        """
+        record = get_weather(search_query, stale_while_revalidate=True)
+        if record is None and is_city_not_found(search_query):
+            city_name = city_registry.correct(search_query)
+            if city_name != search_query:
+                corrected = get_weather(city_name, stale_while_revalidate=True)
+                if corrected is not None:
+                    return city_name, corrected
+        return search_query, record
+
+    def on_weather_result(self, lookup, error):
+        """
+            Handle a finished weather lookup. Always called on the Tk thread.
+        """
+        self.loading_label.pack_forget()
+
+        city_name, record = lookup if lookup is not None else (None, None)
+        if record and city_name != self.search_entry.get():
+            self.search_entry.delete(0, tk.END)
+            self.search_entry.insert(0, city_name)
+
+        if error is not None:
+            print(f"An error occurred while fetching weather data: {error}")
+
+        if record:
+            self.last_record = record
+            print(record.as_dict())
+            self.forecast_worker.submit(city_name, self.on_forecast_result, lookup=get_forecast)
+        else:
+            print("City weather not found")
+            self.city_not_found()
+
+    def on_forecast_result(self, series, error):
+        """
+            Shows a finished forecast lookup. Always called on the Tk thread.
+        """
+        if error is not None:
+            print(f"An error occurred while fetching forecast data: {error}")
+        if series:
+            self.forecast_chart.set_series(series)
+            self.forecast_chart.pack(pady=(10, 0), fill=tk.X)
+
+    def destroy(self):
+        self.after_cancel(self.refresh_id)
+        self.weather_worker.shutdown()
+        self.forecast_worker.shutdown()
+        super().destroy()
 
     def city_not_found(self):
         """
@@ -329,8 +402,7 @@ class SearchBar(tk.Frame):
         style = ttk.Style()
         style.configure("Custom.TLabel", relief="flat", borderwidth=0, background="black")
 
-        image = Image.open("Images/sadcloudsprite.png").resize((420, 300))
-        photo = ImageTk.PhotoImage(image)
+        photo = image_cache.get("Images/sadcloudsprite.png", (420, 300))
 
         if hasattr(self.error_frame, "image_label"):
             self.error_frame.image_label.destroy()
@@ -0,0 +1,145 @@
+import tkinter as tk
+from tkinter import ttk
+from scripts import metrics
+
+
+# Delay before a scheduled query is rendered, in milliseconds
+DEBOUNCE_DELAY = 40
+
+
+class SuggestionList(tk.Frame):
+    """
+        Virtualized list of suggestions.
+
+        The full result set is kept as a Python sequence and only the visible rows exist in the
+        Listbox. Each render compares the new visible rows with the ones on screen and only replaces
+        the rows that changed, so the cost of a keystroke does not depend on the number of matches.
+    """
+
+    def __init__(self, parent, rows=3, on_select=None, debounce_delay=DEBOUNCE_DELAY, **listbox_options):
+        """
+            Args:
+                parent (tk.Widget): Parent widget.
+                rows (int): Number of visible rows.
+                on_select (callable): Called with the selected item when the user picks a row.
+                debounce_delay (int): Delay before a scheduled query is rendered, in milliseconds.
+                **listbox_options: Options forwarded to the underlying Listbox.
+        """
+        super().__init__(parent, bg=listbox_options.get("bg", ""))
+        self.rows = rows
+        self.on_select = on_select
+        self.debounce_delay = debounce_delay
+
+        self.items = []
+        self.offset = 0
+        self._shown = []
+        self._debounce_id = None
+
+        self.listbox = tk.Listbox(self, height=rows, **listbox_options)
+        self.listbox.pack(side=tk.LEFT)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.on_scrollbar)
+
+        self.listbox.bind("<<ListboxSelect>>", self.on_listbox_select)
+        self.listbox.bind("<MouseWheel>", self.on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 1))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 1))
+
+    def set_items(self, items):
+        """
+            Replaces the result set and renders its first rows.
+
+            Args:
+                items (sequence): Suggestions supporting len() and slicing.
+        """
+        self.cancel_scheduled()
+        self.items = items
+        self.offset = 0
+        self.render()
+
+    def schedule(self, query, *args):
+        """
+            Renders the result of query(*args) once typing pauses. Only the latest scheduled query runs.
+
+            Args:
+                query (callable): Returns the suggestions to show.
+        """
+        self.cancel_scheduled()
+        self._debounce_id = self.after(self.debounce_delay, self._run_scheduled, query, args)
+
+    def cancel_scheduled(self):
+        if self._debounce_id is not None:
+            self.after_cancel(self._debounce_id)
+            self._debounce_id = None
+
+    def _run_scheduled(self, query, args):
+        self._debounce_id = None
+        self.set_items(query(*args))
+
+    def scroll_to(self, offset):
+        """
+            Shows the rows starting at offset.
+        """
+        offset = max(0, min(offset, len(self.items) - self.rows))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        """
+            Updates the visible rows, touching only the rows that changed.
+        """
+        with metrics.timer("widget_update"):
+            self._render()
+
+    def _render(self):
+        rows = list(self.items[self.offset:self.offset + self.rows])
+        shown = self._shown
+
+        self.listbox.selection_clear(0, tk.END)
+        for i, row in enumerate(rows):
+            if i >= len(shown):
+                self.listbox.insert(tk.END, row)
+            elif shown[i] != row:
+                self.listbox.delete(i)
+                self.listbox.insert(i, row)
+        if len(shown) > len(rows):
+            self.listbox.delete(len(rows), tk.END)
+        self._shown = rows
+
+        total = len(self.items)
+        if total > self.rows:
+            self.scrollbar.set(self.offset / total, (self.offset + self.rows) / total)
+            if not self.scrollbar.winfo_manager():
+                self.scrollbar.pack(side=tk.LEFT, fill=tk.Y)
+        elif self.scrollbar.winfo_manager():
+            self.scrollbar.pack_forget()
+
+    def selected(self):
+        """
+            Returns the selected item, or None if no row is selected.
+        """
+        selection = self.listbox.curselection()
+        if not selection:
+            return None
+        return self.items[self.offset + selection[0]]
+
+    def on_listbox_select(self, event):
+        item = self.selected()
+        if item is not None and self.on_select is not None:
+            self.on_select(item)
+
+    def on_mousewheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        self.scroll_to(self.offset + step)
+        return "break"
+
+    def on_scrollbar(self, action, *args):
+        """
+            Translates scrollbar commands into row offsets.
+        """
+        if action == "moveto":
+            self.scroll_to(round(float(args[0]) * len(self.items)))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            step = self.rows if unit == "pages" else 1
+            self.scroll_to(self.offset + amount * step)
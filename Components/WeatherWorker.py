@@ -0,0 +1,104 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from scripts.get_weather import get_weather
+
+
+# Interval between polls of the result queue, in milliseconds (~60 fps)
+POLL_INTERVAL = 16
+
+
+class WeatherWorker:
+    """
+        Runs weather lookups on a bounded thread pool and hands results back to the Tk thread.
+
+        Worker threads never touch Tk. Finished lookups are put on a result queue, which is polled from
+        the Tk thread with after(). Every submit() starts a new generation: queued lookups from older
+        generations are cancelled and results that still arrive from them are dropped.
+    """
+
+    def __init__(self, widget, max_workers=2, poll_interval=POLL_INTERVAL):
+        """
+            Args:
+                widget (tk.Widget): Widget used to schedule polling on the Tk event loop.
+                max_workers (int): Maximum number of lookups running at the same time.
+                poll_interval (int): Interval between polls of the result queue, in milliseconds.
+        """
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self.dropped = 0
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather")
+        self._results = queue.Queue()
+        self._generation = 0
+        self._futures = set()
+        self._poll_id = None
+
+    def submit(self, city_name, callback, lookup=get_weather):
+        """
+            Starts a lookup in the background, superseding any lookup still in flight.
+
+            Args:
+                city_name (str): Name of the city.
+                callback (callable): Called on the Tk thread as callback(result, error) once the lookup finishes.
+                lookup (callable): Function performing the lookup, get_weather by default.
+        """
+        self.cancel()
+        generation = self._generation
+
+        future = self._executor.submit(lookup, city_name)
+        self._futures.add(future)
+        future.add_done_callback(lambda f: self._results.put((generation, f, callback)))
+        self._schedule_poll()
+
+    def cancel(self):
+        """
+            Cancels queued lookups and makes sure results of running lookups are dropped.
+        """
+        self._generation += 1
+        for future in self._futures:
+            future.cancel()
+
+    @property
+    def busy(self):
+        """
+            bool: True while a lookup of the current generation has not been delivered yet.
+        """
+        return bool(self._futures)
+
+    def _schedule_poll(self):
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """
+            Delivers finished lookups on the Tk thread.
+        """
+        self._poll_id = None
+        while True:
+            try:
+                generation, future, callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            self._futures.discard(future)
+            if future.cancelled():
+                continue
+            if generation != self._generation:
+                self.dropped += 1
+                continue
+
+            error = future.exception()
+            callback(None if error else future.result(), error)
+
+        if self._futures:
+            self._schedule_poll()
+
+    def shutdown(self):
+        """
+            Stops polling and releases the worker threads without waiting for running lookups.
+        """
+        self.cancel()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,9 +1,16 @@
-# tkinter and picture imports
+import time
+STARTUP_TIME = time.perf_counter()
+
+# tkinter imports. Heavy modules (requests, PIL, the search bar) are imported after the first paint.
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-# application classes
-from Components.SearchBar import SearchBar
+from scripts import metrics
+
+# Time budget from app start to the first paint of the window (in milliseconds)
+FIRST_PAINT_BUDGET = 150
+
+# Startup goes on without a first paint after this delay, e.g. if the window starts iconified (in milliseconds)
+FIRST_PAINT_TIMEOUT = 2000
 
 
 class MainApplication(tk.Tk):
@@ -21,17 +28,98 @@ class MainApplication(tk.Tk):
 
         self.screen1 = tk.Frame(self.notebook, bg="black", padx=0, pady=0)
         self.screen2 = tk.Frame(self.notebook, bg="black")
+        self.screen3 = tk.Frame(self.notebook, bg="black")
 
         self.notebook.add(self.screen1, text="Weather")
         self.notebook.add(self.screen2, text="Crime")
+        self.notebook.add(self.screen3, text="Dashboard")
+
+        # Tab contents are built the first time their tab is shown
+        self.tab_builders = {
+            str(self.screen1): self.modify_weather_screen,
+            str(self.screen2): self.modify_screen2,
+            str(self.screen3): self.modify_dashboard_screen,
+        }
+        self.started = False
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 
-        self.modify_weather_screen()
-        self.modify_screen2()
+        # Live metrics readout, toggled with F12
+        self.debug_overlay = None
+        self.bind_all("<F12>", self.toggle_debug_overlay)
+
+        # Startup goes on once the window has actually been drawn
+        self.painted = False
+        self.expose_binding = self.bind("<Expose>", self.on_first_paint, add="+")
+        self.paint_timeout_id = self.after(FIRST_PAINT_TIMEOUT, self.on_first_paint)
+
+    def on_first_paint(self, event=None):
+        """
+            Records the first paint of the window, then schedules the rest of the startup.
+        """
+        if self.painted:
+            return
+        self.painted = True
+        self.unbind("<Expose>", self.expose_binding)
+        if event is None:
+            print(f"Window not shown after {FIRST_PAINT_TIMEOUT} ms, finishing startup")
+        else:
+            self.after_cancel(self.paint_timeout_id)
+            # Widgets redraw themselves in idle callbacks queued by the Expose event
+            self.update_idletasks()
+            first_paint = time.perf_counter() - STARTUP_TIME
+            metrics.observe("startup_first_paint", first_paint)
+            if first_paint * 1000 > FIRST_PAINT_BUDGET:
+                print(f"First paint took {first_paint * 1000:.0f} ms (budget: {FIRST_PAINT_BUDGET} ms)")
+
+        # Each step runs from its own event loop iteration, so the window stays responsive in between
+        self.after(0, self.finish_startup)
+
+    def finish_startup(self):
+        """
+            Builds the visible tab, importing its heavy modules, then schedules the background services.
+        """
+        self.started = True
+        self.build_current_tab()
+        self.after(0, self.start_services)
+
+    def start_services(self):
+        """
+            Opens the API connection, starts prefetching and the metrics server.
+        """
+        # Open the API connection and keep the most searched cities warm in the weather cache
+        from scripts import http_client
+        from scripts.prefetch import prefetch_scheduler
+        http_client.prewarm()
+        prefetch_scheduler.start()
+
+        if metrics.enabled and metrics.METRICS_PORT:
+            metrics.serve(metrics.METRICS_PORT)
+
+        metrics.observe("startup_ready", time.perf_counter() - STARTUP_TIME)
+
+    def on_tab_changed(self, event):
+        if self.started:
+            self.build_current_tab()
+
+    def build_current_tab(self):
+        """
+            Builds the contents of the selected tab if they have not been built yet.
+        """
+        builder = self.tab_builders.pop(self.notebook.select(), None)
+        if builder is not None:
+            builder()
+
+    def toggle_debug_overlay(self, event=None):
+        if self.debug_overlay is None:
+            from Components.DebugOverlay import DebugOverlay
+            self.debug_overlay = DebugOverlay(self)
+        self.debug_overlay.toggle()
 
     def modify_weather_screen(self):
         """
             Modify the content of Screen 1.
         """
+        from Components.SearchBar import SearchBar
         search_bar = SearchBar(self.screen1)
         search_bar.pack(padx=0, pady=0)
 
@@ -42,6 +130,14 @@ class MainApplication(tk.Tk):
         label2 = tk.Label(self.screen2, text="Crime", bg="#000000", fg="#FFFFFF")
         label2.pack(pady=20)
 
+    def modify_dashboard_screen(self):
+        """
+            Modify the content of the Dashboard screen.
+        """
+        from Components.Dashboard import Dashboard
+        dashboard = Dashboard(self.screen3, bg="#000000")
+        dashboard.pack(fill=tk.BOTH, expand=True)
+
 
 if __name__ == "__main__":
     app = MainApplication()
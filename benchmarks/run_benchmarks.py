@@ -0,0 +1,293 @@
+"""
+Offline benchmark suite.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks --save benchmarks/baseline.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baseline.json --threshold 0.2
+
+Weather lookups go to a local stub server instead of the weather API, and every file the app
+writes (weather cache database, valid cities file) is redirected to a temporary directory.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import string
+import sys
+import tempfile
+import time
+import types
+
+try:
+    import scripts.config  # noqa: F401
+except ImportError:
+    # The benchmarks never reach the real API, so no API key is needed
+    sys.modules['scripts.config'] = types.SimpleNamespace(API_KEY="benchmark")
+
+from benchmarks.stub_server import StubServer
+from scripts import get_weather as weather
+from scripts import valid_cities
+from scripts.city_index import PrefixIndex
+from scripts.city_registry import city_registry
+from scripts.gazetteer import Gazetteer
+from scripts.rate_limiter import RateLimiter
+from scripts.spatial_index import GeoGrid
+from scripts.weather_cache import NegativeCache, WeatherCache
+from scripts.weather_record import WeatherRecord
+
+
+def random_city_names(count, seed=0):
+    """
+    Returns distinct, reproducible fake city names.
+    """
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        words = rng.randint(1, 2)
+        names.add(" ".join(
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))).title()
+            for _ in range(words)
+        ))
+    return sorted(names)
+
+
+def measure(function, repeat, setup=None):
+    """
+    Runs function() repeat times and returns the duration of each run in seconds.
+
+    Args:
+        function (callable): Code to time.
+        repeat (int): Number of runs.
+        setup (callable): Called before each run, outside the timed section.
+
+    Returns:
+        list: Durations in seconds.
+    """
+    durations = []
+    for i in range(repeat):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        function(i)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    return {
+        'runs': len(ordered),
+        'median': statistics.median(ordered),
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'min': ordered[0],
+    }
+
+
+def isolate(temp_dir, base_url):
+    """
+    Points the weather pipeline at the stub server and at files inside temp_dir.
+    """
+    weather.API_BASE_URL = base_url
+    weather.weather_cache = WeatherCache(db_path=os.path.join(temp_dir, "weather_cache.db"))
+    # No gazetteer: benchmark cities are made up and must not be rejected
+    weather.city_gazetteer = Gazetteer(os.path.join(temp_dir, "gazetteer.bin"))
+    weather.cached_locations = GeoGrid()
+    weather.cached_locations_seeded = False
+    weather.negative_cache = NegativeCache(weather.negative_cache.ttls)
+    weather.rate_limiter = RateLimiter(per_minute=10 ** 9, per_day=10 ** 12)
+
+    cities_path = os.path.join(temp_dir, "valid_cities.txt")
+    shutil.copyfile(valid_cities.VALID_CITIES_PATH, cities_path)
+    valid_cities.VALID_CITIES_PATH = cities_path
+    city_registry.path = cities_path
+    city_registry.refresh()
+
+
+def bench_get_weather(results, repeat):
+    names = [f"bench city {i}" for i in range(repeat)]
+
+    results['get_weather.cold_miss'] = summarize(measure(
+        lambda i: weather.get_weather(names[i]), repeat))
+
+    results['get_weather.warm_hit'] = summarize(measure(
+        lambda i: weather.get_weather(names[i % len(names)]), repeat * 10))
+
+    def expire(i):
+        # Cached records are shared and never modified: replace the record with an expired copy
+        record = weather.weather_cache.get(names[i])
+        weather.weather_cache[names[i]] = WeatherRecord(
+            record.weather, record.kelvin, record.city_id, record.time - weather.CACHE_EXPIRATION_TIME - 1,
+            record.lat, record.lon)
+
+    results['get_weather.expired'] = summarize(measure(
+        lambda i: weather.get_weather(names[i]), repeat, setup=expire))
+
+
+def bench_city_search(results, repeat, sizes):
+    prefixes = ["", "a", "ma", "san", "zz"]
+    for size in sizes:
+        index = PrefixIndex(random_city_names(size))
+        results[f'check_listbox.index.{size}'] = summarize(measure(
+            lambda i: index.matches(prefixes[i % len(prefixes)]), repeat * len(prefixes)))
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Skipping update_listbox benchmarks: {e}")
+        return
+
+    from Components.SuggestionList import SuggestionList
+    try:
+        for size in sizes:
+            index = PrefixIndex(random_city_names(size))
+            suggestions = SuggestionList(root, rows=3)
+            suggestions.pack()
+
+            def render(i):
+                suggestions.set_items(index.matches(prefixes[i % len(prefixes)]))
+                root.update_idletasks()
+
+            results[f'update_listbox.{size}'] = summarize(measure(render, repeat * len(prefixes)))
+            suggestions.destroy()
+    finally:
+        root.destroy()
+
+
+def bench_add_valid_city(results, repeat):
+    names = random_city_names(repeat, seed=1)
+
+    def add(i):
+        valid_cities.add_valid_city(names[i])
+
+    results['add_valid_city'] = summarize(measure(add, repeat))
+
+    start = time.perf_counter()
+    valid_cities.flush_valid_cities()
+    results['add_valid_city.flush'] = summarize([time.perf_counter() - start])
+
+
+def bench_images(results, repeat):
+    try:
+        import tkinter as tk
+        from Components.ImageCache import ASSET_SIZES, ImageCache, load_image
+        root = tk.Tk()
+    except Exception as e:
+        print(f"Skipping image benchmarks: {e}")
+        return
+
+    try:
+        results['images.decode_resize'] = summarize(measure(
+            lambda i: [load_image(path, size, pack_dir="") for path, size in ASSET_SIZES], repeat))
+
+        cache = ImageCache()
+        cache.preload()
+        results['images.cached'] = summarize(measure(
+            lambda i: [cache.get(path, size) for path, size in ASSET_SIZES], repeat * 10))
+    finally:
+        root.destroy()
+
+
+def bench_startup(results, repeat):
+    try:
+        import app
+        from scripts import http_client
+        from scripts.prefetch import prefetch_scheduler
+    except Exception as e:
+        print(f"Skipping startup benchmark: {e}")
+        return
+
+    # Startup is measured without network access or background jobs
+    http_client.prewarm = lambda *args, **kwargs: None
+    prefetch_scheduler.start = lambda: None
+
+    def start(i):
+        main_application = app.MainApplication()
+        main_application.update()
+        main_application.destroy()
+
+    try:
+        results['startup.main_application'] = summarize(measure(start, repeat))
+    except Exception as e:
+        print(f"Skipping startup benchmark: {e}")
+
+
+def run(repeat, sizes):
+    results = {}
+    temp_dir = tempfile.mkdtemp(prefix="weather-bench-")
+    try:
+        with StubServer() as server:
+            isolate(temp_dir, server.url)
+            bench_get_weather(results, repeat)
+            bench_city_search(results, repeat, sizes)
+            bench_add_valid_city(results, repeat)
+            bench_images(results, repeat)
+            bench_startup(results, max(repeat // 10, 3))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints how each benchmark moved against a baseline.
+
+    Returns:
+        list: Names of the benchmarks whose median got slower by more than threshold.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:40} {result['median'] * 1e6:12.1f} us   (new)")
+            continue
+        change = result['median'] / base['median'] - 1 if base['median'] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:40} {result['median'] * 1e6:12.1f} us   {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--repeat", type=int, default=50, help="number of runs per benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="city list sizes for the search benchmarks")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare the results against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative slowdown of the median reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat, args.sizes)
+
+    if args.save:
+        with open(args.save, 'w') as writing:
+            json.dump({
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'results': results,
+            }, writing, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare, 'r') as reading:
+            baseline = json.load(reading)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    else:
+        for name, result in sorted(results.items()):
+            print(f"{name:40} {result['median'] * 1e6:12.1f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
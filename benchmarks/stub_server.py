@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def city_id(city_name):
+    """
+    Returns a stable fake city ID for a city name.
+    """
+    return sum((i + 1) * ord(char) for i, char in enumerate(city_name.lower())) % 10_000_000
+
+
+def weather_json(city_name, identifier=None):
+    """
+    Returns a response body shaped like the weather API's current weather data.
+    """
+    return {
+        'coord': {'lon': -118.24, 'lat': 34.05},
+        'weather': [{'id': 800, 'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+        'main': {'temp': 295.6, 'feels_like': 295.3, 'temp_min': 293.15, 'temp_max': 298.15, 'pressure': 1015, 'humidity': 40},
+        'wind': {'speed': 5.8, 'deg': 250},
+        'dt': int(time.time()),
+        'id': identifier if identifier is not None else city_id(city_name),
+        'name': city_name.title(),
+        'cod': 200,
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers /data/2.5/weather and /data/2.5/group requests like the weather API.
+
+    Cities whose name starts with "unknown" get a 404.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        if url.path == "/data/2.5/weather":
+            city_name = query.get('q', [''])[0]
+            if city_name.lower().startswith("unknown"):
+                self.send_json(404, {'cod': '404', 'message': 'city not found'})
+            else:
+                self.send_json(200, weather_json(city_name))
+        elif url.path == "/data/2.5/group":
+            ids = [int(i) for i in query.get('id', [''])[0].split(",") if i]
+            body = {'cnt': len(ids), 'list': [weather_json(f"city {i}", i) for i in ids]}
+            self.send_json(200, body)
+        else:
+            self.send_json(404, {'cod': '404', 'message': 'not found'})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.end_headers()
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """
+    Local HTTP server standing in for the weather API, running in a daemon thread.
+    """
+
+    def __init__(self, latency=0.0):
+        """
+        Args:
+            latency (float): Delay added to every response, in seconds.
+        """
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+
+class PrefixMatches(Sequence):
+    """
+    Read-only view of a contiguous run of cities in a PrefixIndex.
+
+    Creating the view costs two binary searches; names are only fetched when rows are read.
+    """
+
+    def __init__(self, cities, start, end):
+        self._cities = cities
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self._cities[self.start + i] for i in range(start, stop, step)]
+            return self._cities[self.start + start:self.start + max(start, stop)]
+        if item < 0:
+            item += len(self)
+        if not 0 <= item < len(self):
+            raise IndexError("match index out of range")
+        return self._cities[self.start + item]
+
+
+class PrefixIndex:
+    """
+    Case-folded prefix index over a list of city names.
+
+    The names are sorted once by their case-folded form. A prefix query is a binary search for the
+    first matching key followed by a slice, so its cost depends on the number of results returned and
+    not on the number of cities.
+    """
+
+    def __init__(self, cities):
+        """
+        Args:
+            cities (iterable): City names to index.
+        """
+        pairs = sorted((city.casefold(), city) for city in cities)
+        self.keys = [key for key, _ in pairs]
+        self.cities = [city for _, city in pairs]
+
+    def matches(self, prefix):
+        """
+        Returns a lazy view of every city whose name starts with a prefix, ignoring case.
+
+        Args:
+            prefix (str): Text typed by the user.
+
+        Returns:
+            PrefixMatches: Matching city names in sorted order.
+        """
+        prefix = prefix.casefold()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + "\U0010ffff", start)
+        return PrefixMatches(self.cities, start, end)
+
+    def added(self, cities):
+        """
+        Returns a new index holding this index's cities plus some more.
+
+        The existing index is left untouched, so readers holding it never see a half-updated index.
+        The new cities are sorted and merged in a single pass that copies the existing lists once,
+        whatever the number of cities added.
+
+        Args:
+            cities (iterable): City names to add.
+
+        Returns:
+            PrefixIndex: The new index.
+        """
+        index = PrefixIndex(())
+        start = 0
+        for key, city in sorted((city.casefold(), city) for city in cities):
+            position = bisect_right(self.keys, key, start)
+            index.keys += self.keys[start:position]
+            index.cities += self.cities[start:position]
+            index.keys.append(key)
+            index.cities.append(city)
+            start = position
+        index.keys += self.keys[start:]
+        index.cities += self.cities[start:]
+        return index
+
+    def __len__(self):
+        return len(self.keys)
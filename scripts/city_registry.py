@@ -0,0 +1,251 @@
+import os
+import threading
+from scripts import metrics
+from scripts.city_index import PrefixIndex
+from scripts.fuzzy_index import FuzzyIndex
+
+# File holding the list of valid cities, one per line
+VALID_CITIES_PATH = "scripts/valid_cities.txt"
+
+# Number of typo-tolerant suggestions shown when no city starts with the typed text
+FUZZY_SUGGESTION_LIMIT = 5
+
+
+class CityRegistry:
+    """
+    Process-wide, in-memory list of valid cities with a prebuilt prefix index.
+
+    The file is read once. Afterwards refresh() compares the file's mtime and size with the last
+    load: if the file only grew, just the appended lines are read; any other change triggers a full
+    reload. Cities added in-process through add_many() are known right away and merged into the
+    prefix index in one batch the next time the index is read.
+
+    The index is replaced, never modified in place, so readers on other threads always see a
+    consistent index. The typo-tolerant FuzzyIndex is only built on demand (see build_fuzzy_index())
+    and only grows by appending.
+    """
+
+    def __init__(self, path=VALID_CITIES_PATH):
+        """
+        Args:
+            path (str): Path of the valid cities file.
+        """
+        self.path = path
+        self._index = None
+        self._unindexed = []
+        self._fuzzy = None
+        self._fuzzy_building = False
+        self._known = set()
+        self._mtime = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def index(self):
+        """
+        PrefixIndex: Index over every known city. Loads the file on first use and merges the cities
+        added since the last read.
+        """
+        if self._index is None or self._unindexed:
+            with self._lock:
+                if self._index is None:
+                    self._load()
+                elif self._unindexed:
+                    self._index = self._index.added(self._unindexed)
+                    self._unindexed = []
+        return self._index
+
+    @property
+    def fuzzy_index(self):
+        """
+        FuzzyIndex: Typo-tolerant index over every known city, or None until build_fuzzy_index() ran.
+        """
+        return self._fuzzy
+
+    def build_fuzzy_index(self, background=False):
+        """
+        Builds the typo-tolerant index. It takes a few seconds at 200k cities, so the UI builds it
+        in the background.
+
+        Args:
+            background (bool): Build in a daemon thread instead of blocking the caller. Does nothing
+                if a background build is already running.
+        """
+        if background:
+            with self._lock:
+                if self._fuzzy_building:
+                    return
+                self._fuzzy_building = True
+            threading.Thread(target=self._build_fuzzy_index_in_background, name="fuzzy-index", daemon=True).start()
+            return
+
+        index = self.index
+        fuzzy = FuzzyIndex(index.cities)
+        with self._lock:
+            if self._index is not index or self._unindexed:
+                # Pick up the cities added while building
+                built = set(index.cities)
+                for city in self._index.cities + self._unindexed:
+                    if city not in built:
+                        fuzzy.add(city)
+            self._fuzzy = fuzzy
+
+    def _build_fuzzy_index_in_background(self):
+        try:
+            self.build_fuzzy_index()
+        finally:
+            with self._lock:
+                self._fuzzy_building = False
+
+    @property
+    def cities(self):
+        """
+        list: Every known city in sorted order.
+        """
+        return self.index.cities
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None, 0
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_from(self, offset):
+        """
+        Reads the city names stored in the file after a byte offset.
+
+        Returns:
+            tuple: The names read and the offset just past the last complete line.
+        """
+        try:
+            with metrics.timer("city_file_io"), open(self.path, 'rb') as reading:
+                reading.seek(offset)
+                data = reading.read()
+        except OSError:
+            return [], offset
+
+        # Ignore a trailing partial line; it is picked up by the next refresh
+        end = data.rfind(b"\n") + 1
+        names = [line.strip() for line in data[:end].decode("utf-8").splitlines()]
+        return names, offset + end
+
+    def _new_cities(self, names):
+        cities = []
+        for name in names:
+            key = name.casefold()
+            if name and key not in self._known:
+                self._known.add(key)
+                cities.append(name)
+                if self._fuzzy is not None:
+                    self._fuzzy.add(name)
+        return cities
+
+    def _load(self):
+        self._known = set()
+        self._unindexed = []
+        self._fuzzy = None
+        mtime, _ = self._stat()
+        names, self._size = self._read_from(0)
+        self._mtime = mtime
+        self._index = PrefixIndex(self._new_cities(names))
+
+    def refresh(self):
+        """
+        Picks up changes made to the file since the last load. Does nothing until the file has been
+        loaded: its first use reads it whole.
+
+        Returns:
+            bool: True if the index changed.
+        """
+        if self._index is None:
+            return False
+
+        mtime, size = self._stat()
+        if mtime == self._mtime and size == self._size:
+            return False
+
+        with self._lock:
+            if size > self._size:
+                names, self._size = self._read_from(self._size)
+                self._mtime = mtime
+                cities = self._new_cities(names)
+                self._unindexed.extend(cities)
+                return bool(cities)
+
+            rebuild_fuzzy = self._fuzzy is not None
+            self._load()
+        if rebuild_fuzzy:
+            self.build_fuzzy_index(background=True)
+        return True
+
+    def add(self, city_name):
+        """
+        Adds a city written to the file by this process. See add_many().
+        """
+        self.add_many([city_name])
+
+    def add_many(self, city_names):
+        """
+        Adds cities written to the file by this process.
+
+        They are known right away; the prefix index is copied once for the whole batch, when it is
+        next read, instead of once per city.
+
+        Args:
+            city_names (iterable): Names of the cities.
+
+        Returns:
+            list: The cities that were not known yet.
+        """
+        if self._index is None:
+            self.index
+        with self._lock:
+            cities = self._new_cities(name.strip() for name in city_names)
+            self._unindexed.extend(cities)
+        return cities
+
+    def suggest(self, text):
+        """
+        Returns the cities to suggest for the text typed so far.
+
+        Cities starting with the text come first; if there are none, the closest cities are
+        suggested instead, so that typos still lead somewhere.
+
+        Args:
+            text (str): Text typed by the user.
+
+        Returns:
+            sequence: City names.
+        """
+        matches = self.index.matches(text)
+        if len(matches) or self._fuzzy is None:
+            return matches
+        return [city for city, _ in self._fuzzy.search(text, limit=FUZZY_SUGGESTION_LIMIT)]
+
+    def correct(self, city_name):
+        """
+        Returns the known city a name most likely refers to.
+
+        Meant as a fallback once a lookup of the name itself failed: the list of valid cities only
+        holds cities looked up before, so a real city close to a listed one would be rewritten.
+
+        Args:
+            city_name (str): Name typed by the user.
+
+        Returns:
+            str: The name itself if it is known or nothing close enough is known, otherwise the closest city.
+        """
+        if city_name in self or self._fuzzy is None:
+            return city_name
+        return self._fuzzy.correct(city_name) or city_name
+
+    def __contains__(self, city_name):
+        # Only loads the file: membership does not need the added cities to be merged into the index
+        if self._index is None:
+            self.index
+        return city_name.strip().casefold() in self._known
+
+
+# Shared registry of valid cities
+city_registry = CityRegistry()
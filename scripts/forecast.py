@@ -0,0 +1,105 @@
+import base64
+from array import array
+
+# Typecodes of the forecast columns: epoch seconds, then temperature and precipitation
+TIME_TYPECODE = 'q'
+VALUE_TYPECODE = 'f'
+
+
+class ForecastSeries:
+    """
+    Multi-day forecast of a city stored as parallel arrays instead of a list of dictionaries.
+
+    - times: forecast timestamps in epoch seconds.
+    - temperature: temperature at each timestamp, in kelvin.
+    - precipitation: rain plus snow over the 3 hours before each timestamp, in mm.
+
+    A 5-day/3-hour forecast holds 40 points, about 640 bytes of column data.
+    """
+
+    __slots__ = ("times", "temperature", "precipitation")
+
+    def __init__(self, times=(), temperature=(), precipitation=()):
+        self.times = array(TIME_TYPECODE, times)
+        self.temperature = array(VALUE_TYPECODE, temperature)
+        self.precipitation = array(VALUE_TYPECODE, precipitation)
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_json(cls, forecast_json):
+        """
+        Builds a series from the response of the 5-day/3-hour forecast endpoint.
+
+        Args:
+            forecast_json (dict): Forecast data, as returned by the weather API.
+
+        Returns:
+            ForecastSeries: The forecast, ordered by time.
+        """
+        series = cls()
+        for point in sorted(forecast_json['list'], key=lambda point: point['dt']):
+            series.times.append(point['dt'])
+            series.temperature.append(point['main']['temp'])
+            series.precipitation.append(
+                point.get('rain', {}).get('3h', 0.0) + point.get('snow', {}).get('3h', 0.0)
+            )
+        return series
+
+    def to_entry(self):
+        """
+        Returns the series as a JSON-serializable dictionary for the weather cache.
+        """
+        return {
+            'times': _encode(self.times),
+            'temperature': _encode(self.temperature),
+            'precipitation': _encode(self.precipitation),
+        }
+
+    @classmethod
+    def from_entry(cls, entry):
+        """
+        Rebuilds a series from a dictionary created by to_entry().
+        """
+        series = cls()
+        series.times = _decode(TIME_TYPECODE, entry['times'])
+        series.temperature = _decode(VALUE_TYPECODE, entry['temperature'])
+        series.precipitation = _decode(VALUE_TYPECODE, entry['precipitation'])
+        return series
+
+
+def _encode(column):
+    return base64.b64encode(column.tobytes()).decode("ascii")
+
+
+def _decode(typecode, data):
+    column = array(typecode)
+    column.frombytes(base64.b64decode(data))
+    return column
+
+
+def downsample(values, buckets):
+    """
+    Reduces a column to at most buckets (low, high) pairs, keeping the extremes of each bucket.
+
+    Args:
+        values (sequence): Values to reduce.
+        buckets (int): Maximum number of buckets, e.g. the pixel width of a chart.
+
+    Returns:
+        list: (start_index, low, high) for each bucket, in order.
+    """
+    count = len(values)
+    if count == 0 or buckets <= 0:
+        return []
+    if count <= buckets:
+        return [(i, value, value) for i, value in enumerate(values)]
+
+    reduced = []
+    for bucket in range(buckets):
+        start = bucket * count // buckets
+        end = (bucket + 1) * count // buckets
+        chunk = values[start:end]
+        reduced.append((start, min(chunk), max(chunk)))
+    return reduced
@@ -0,0 +1,167 @@
+from array import array
+from collections import Counter
+
+
+def trigrams(text):
+    """
+    Returns the set of character trigrams of a text, padded so that word starts weigh more.
+
+    Args:
+        text (str): Case-folded text.
+
+    Returns:
+        set: Trigrams of the text.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Returns the Levenshtein distance between two strings, giving up once it exceeds max_distance.
+
+    Args:
+        a (str): First string.
+        b (str): Second string.
+        max_distance (int): Largest distance of interest.
+
+    Returns:
+        int: The distance, or max_distance + 1 if the strings are further apart.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # Only cells within max_distance of the diagonal can stay under the limit
+    too_far = max_distance + 1
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        if low == 1:
+            current[0] = i if i <= max_distance else too_far
+        best = current[0]
+        for j in range(low, high + 1):
+            cost = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > max_distance:
+            return too_far
+        previous = current
+    return min(previous[-1], too_far)
+
+
+def default_max_distance(text):
+    """
+    Returns the number of typos tolerated in a query of a given length.
+    """
+    if len(text) <= 4:
+        return 1
+    return 2 if len(text) <= 12 else 3
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant index over city names.
+
+    Posting lists are split by name length, so a query only reads the lists of names whose length is
+    within the typo budget. A name within edit distance d of the query shares all but at most 3 * d
+    of the query's trigrams, so it contains at least one of any 3 * d + 1 of them: candidates are
+    gathered from the rarest query trigrams only, then the best few are ranked by edit distance.
+    """
+
+    # Number of trigram candidates re-ranked by edit distance per result asked for
+    CANDIDATES_PER_RESULT = 4
+
+    def __init__(self, cities=()):
+        """
+        Args:
+            cities (iterable): City names to index.
+        """
+        self.cities = []
+        self.keys = []
+        self.postings = {}
+        for city in cities:
+            self.add(city)
+
+    def add(self, city):
+        """
+        Adds a city to the index.
+
+        Args:
+            city (str): Name of the city.
+        """
+        key = " ".join(city.casefold().split())
+        city_id = len(self.cities)
+        self.cities.append(city)
+        self.keys.append(key)
+        length = len(key)
+        for gram in trigrams(key):
+            postings = self.postings.get((gram, length))
+            if postings is None:
+                postings = self.postings[(gram, length)] = array('I')
+            postings.append(city_id)
+
+    def search(self, query, limit=5, max_distance=None):
+        """
+        Returns the cities closest to a query, best first.
+
+        Args:
+            query (str): Text typed by the user.
+            limit (int): Maximum number of cities to return.
+            max_distance (int): Largest edit distance accepted. Defaults to default_max_distance(query).
+
+        Returns:
+            list: (city, distance) tuples ranked by distance.
+        """
+        key = " ".join(query.casefold().split())
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = default_max_distance(key)
+
+        lengths = range(max(len(key) - max_distance, 1), len(key) + max_distance + 1)
+        gram_postings = []
+        for gram in trigrams(key):
+            postings = [self.postings[(gram, length)] for length in lengths if (gram, length) in self.postings]
+            if postings:
+                gram_postings.append((sum(len(p) for p in postings), postings))
+
+        # Grams that never occur are among the ones an edit may have removed
+        missing = len(trigrams(key)) - len(gram_postings)
+        gram_postings.sort(key=lambda item: item[0])
+        counts = Counter()
+        for _, postings in gram_postings[:max(3 * max_distance + 1 - missing, 0)]:
+            for p in postings:
+                counts.update(p)
+
+        ranked = []
+        for city_id, shared in counts.most_common(limit * self.CANDIDATES_PER_RESULT):
+            distance = edit_distance(key, self.keys[city_id], max_distance)
+            if distance <= max_distance:
+                ranked.append((distance, -shared, self.cities[city_id]))
+
+        ranked.sort()
+        return [(city, distance) for distance, _, city in ranked[:limit]]
+
+    def correct(self, query, max_distance=None):
+        """
+        Returns the city a query most likely refers to.
+
+        Args:
+            query (str): Text typed by the user.
+            max_distance (int): Largest edit distance accepted. Defaults to default_max_distance(query).
+
+        Returns:
+            str: The closest city, or None if no city is close enough.
+        """
+        results = self.search(query, limit=1, max_distance=max_distance)
+        return results[0][0] if results else None
+
+    def __len__(self):
+        return len(self.cities)
@@ -0,0 +1,296 @@
+"""
+Offline gazetteer: resolves city names to the weather API's city IDs without any request.
+
+The index is built once from the provider's bulk city list
+(http://bulk.openweathermap.org/sample/city.list.json.gz):
+
+    python -m scripts.gazetteer city.list.json.gz
+
+Every city is indexed under its normalized name, "name,country" and, where the list has one,
+"name,state,country". Aliases from scripts/city_aliases.txt ("la = los angeles,us") are added at
+build time. A key shared by several cities ("springfield") is kept as known but ambiguous, without
+an ID, so it is still looked up by name; an alias can pin it to one city.
+
+File layout: a header, a zlib-compressed table with the first key of every block, then the blocks
+themselves, each a zlib-compressed run of sorted "key<TAB>id<TAB>name" lines, where name is the
+city's name as spelled in the list and both fields are empty for ambiguous keys. The file is
+memory-mapped and only the blocks a lookup lands in are decompressed.
+"""
+import argparse
+import bisect
+import gzip
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+
+# Index file built from the provider's city list
+GAZETTEER_PATH = "scripts/gazetteer.bin"
+
+# Aliases added to the index at build time, one "alias = name" per line
+ALIASES_PATH = "scripts/city_aliases.txt"
+
+# Number of keys per compressed block
+BLOCK_SIZE = 256
+
+# Number of decompressed blocks kept in memory
+BLOCK_CACHE_SIZE = 32
+
+MAGIC = b"OWMGAZ2\n"
+_HEADER = struct.Struct("<8sII")
+
+
+def normalize(name):
+    """
+    Returns the lookup key of a city name: accents removed, case folded, whitespace collapsed and no
+    spaces around commas, so that "São Paulo , BR" and "sao paulo,br" share a key.
+
+    Args:
+        name (str): City name, optionally followed by ",country" or ",state,country".
+
+    Returns:
+        str: The normalized key.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    parts = (" ".join(part.split()) for part in stripped.casefold().split(","))
+    return ",".join(part for part in parts if part)
+
+
+class Gazetteer:
+    """
+    Read-only, memory-mapped index from normalized city names to city IDs and canonical names.
+
+    The file is opened on first use. If it has not been built, the gazetteer is unavailable and
+    every lookup returns None.
+    """
+
+    def __init__(self, path=GAZETTEER_PATH):
+        """
+        Args:
+            path (str): Path of the index file.
+        """
+        self.path = path
+        self._map = None
+        self._first_keys = None
+        self._blocks = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._opened = False
+
+    def _open(self):
+        with self._lock:
+            if self._opened:
+                return
+            self._opened = True
+            try:
+                with open(self.path, 'rb') as reading:
+                    self._map = mmap.mmap(reading.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, table_offset, table_length = _HEADER.unpack_from(self._map, 0)
+                if magic != MAGIC:
+                    raise ValueError("not a gazetteer file of this version, rebuild it")
+                table = json.loads(zlib.decompress(self._map[table_offset:table_offset + table_length]))
+            except (OSError, ValueError, struct.error, zlib.error) as e:
+                if not isinstance(e, FileNotFoundError):
+                    print(f"City gazetteer unavailable: {e}")
+                self._map = None
+                return
+            self._first_keys = [key for key, _, _ in table]
+            self._blocks = [(offset, length) for _, offset, length in table]
+
+    @property
+    def available(self):
+        """
+        bool: True if the index file has been built and could be opened.
+        """
+        if not self._opened:
+            self._open()
+        return self._map is not None
+
+    def _block(self, number):
+        """
+        Returns the decompressed keys, IDs and names of a block, from the block cache when possible.
+        """
+        with self._lock:
+            block = self._cache.get(number)
+            if block is not None:
+                self._cache.move_to_end(number)
+                return block
+
+        offset, length = self._blocks[number]
+        keys = []
+        ids = []
+        names = []
+        for line in zlib.decompress(self._map[offset:offset + length]).decode("utf-8").splitlines():
+            key, city_id, name = line.split("\t")
+            keys.append(key)
+            ids.append(int(city_id) if city_id else None)
+            names.append(name or None)
+        block = (keys, ids, names)
+
+        with self._lock:
+            self._cache[number] = block
+            while len(self._cache) > BLOCK_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return block
+
+    def lookup(self, name):
+        """
+        Returns the city a name or alias refers to.
+
+        Args:
+            name (str): City name as typed, e.g. "Los Angeles", "los angeles,us" or "LA".
+
+        Returns:
+            tuple: (city_id, canonical_name), both None if the name is ambiguous, or None if the name
+            is unknown or the gazetteer is unavailable.
+        """
+        if not self.available:
+            return None
+        key = normalize(name)
+        number = bisect.bisect_right(self._first_keys, key) - 1
+        if number < 0:
+            return None
+
+        keys, ids, names = self._block(number)
+        position = bisect.bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            return ids[position], names[position]
+        return None
+
+    def resolve(self, name):
+        """
+        Returns the city ID a name or alias refers to, or None if it is unknown or ambiguous.
+        """
+        city = self.lookup(name)
+        return city[0] if city is not None else None
+
+    def canonical_name(self, name):
+        """
+        Returns the name of the city a name or alias refers to, as spelled in the provider's list
+        ("la" gives "Los Angeles"), or None if it is unknown or ambiguous.
+        """
+        city = self.lookup(name)
+        return city[1] if city is not None else None
+
+    def __contains__(self, name):
+        # Ambiguous names are known too
+        return self.lookup(name) is not None
+
+
+def read_aliases(path=ALIASES_PATH):
+    """
+    Returns the (alias, name) pairs of an aliases file. Blank lines and lines starting with # are skipped.
+    """
+    aliases = []
+    try:
+        with open(path, 'r', encoding="utf-8") as reading:
+            for line in reading:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                alias, name = line.split("=", 1)
+                aliases.append((normalize(alias), normalize(name)))
+    except OSError:
+        pass
+    return aliases
+
+
+def build_gazetteer(source_path, path=GAZETTEER_PATH, aliases_path=ALIASES_PATH):
+    """
+    Builds the index file from the provider's city list.
+
+    Args:
+        source_path (str): Path of city.list.json or city.list.json.gz.
+        path (str): Path of the index file to write.
+        aliases_path (str): Path of the aliases file.
+
+    Returns:
+        int: Number of keys in the index.
+    """
+    opener = gzip.open if source_path.endswith(".gz") else open
+    with opener(source_path, 'rt', encoding="utf-8") as reading:
+        cities = json.load(reading)
+
+    ids = {}
+    names = {}
+    ambiguous = set()
+    for city in cities:
+        name = normalize(city['name'])
+        if not name:
+            continue
+        names[city['id']] = city['name'].strip()
+        keys = [name]
+        country = normalize(city.get('country') or "")
+        if country:
+            keys.append(f"{name},{country}")
+            state = normalize(city.get('state') or "")
+            if state:
+                keys.append(f"{name},{state},{country}")
+        for key in keys:
+            if ids.setdefault(key, city['id']) != city['id']:
+                ambiguous.add(key)
+
+    # The list has no population or other ranking to pick one of several cities by
+    for key in ambiguous:
+        ids[key] = None
+
+    for alias, name in read_aliases(aliases_path):
+        if ids.get(name) is not None:
+            ids[alias] = ids[name]
+        elif name in ids:
+            print(f"Alias target is ambiguous: {alias} = {name}")
+        else:
+            print(f"Alias target not found: {alias} = {name}")
+
+    def line(key):
+        city_id = ids[key]
+        if city_id is None:
+            return f"{key}\t\t\n"
+        return f"{key}\t{city_id}\t{names[city_id]}\n"
+
+    keys = sorted(ids)
+    blocks = []
+    table = []
+    offset = _HEADER.size
+    for start in range(0, len(keys), BLOCK_SIZE):
+        chunk = keys[start:start + BLOCK_SIZE]
+        data = zlib.compress("".join(line(key) for key in chunk).encode("utf-8"), 9)
+        table.append((chunk[0], offset, len(data)))
+        blocks.append(data)
+        offset += len(data)
+    table_data = zlib.compress(json.dumps(table).encode("utf-8"), 9)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".gazetteer.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as writing:
+            writing.write(_HEADER.pack(MAGIC, offset, len(table_data)))
+            for data in blocks:
+                writing.write(data)
+            writing.write(table_data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    return len(keys)
+
+
+# Shared gazetteer, opened on first use
+city_gazetteer = Gazetteer()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the offline city gazetteer.")
+    parser.add_argument("source", help="city.list.json.gz from http://bulk.openweathermap.org/sample/")
+    parser.add_argument("--output", default=GAZETTEER_PATH, help="index file to write")
+    parser.add_argument("--aliases", default=ALIASES_PATH, help="aliases file")
+    args = parser.parse_args()
+    count = build_gazetteer(args.source, args.output, args.aliases)
+    print(f"Indexed {count} names into {args.output}")
@@ -1,30 +1,226 @@
 import requests
+import threading
 import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from scripts import http_client, metrics
 from scripts.config import API_KEY
+from scripts.forecast import ForecastSeries
+from scripts.gazetteer import city_gazetteer, normalize
 from scripts.valid_cities import add_valid_city
+from scripts.weather_cache import WeatherCache, NegativeCache
+from scripts.weather_record import WeatherRecord, decode_json
+from scripts.single_flight import SingleFlight
+from scripts.spatial_index import GeoGrid
+from scripts.rate_limiter import RateLimiter, RateLimitExceeded, INTERACTIVE, BACKGROUND, parse_retry_after
 
 class CityNotFoundError(Exception):
     pass
 
-# Create a dictionary to store cached weather data
-weather_cache = {}
+# Base URL of the weather API
+API_BASE_URL = "https://api.openweathermap.org"
 
 # Define the expiration time for the cached weather data (in seconds)
 CACHE_EXPIRATION_TIME = 3600  # 1 hour
 
-def make_weather_api_request(city_name):
+# Stale-while-revalidate: serve expired data immediately while it is refreshed in the background,
+# as long as it is no older than CACHE_EXPIRATION_TIME + MAX_STALE_TIME (in seconds)
+STALE_WHILE_REVALIDATE = False
+MAX_STALE_TIME = 3600  # 1 hour
+
+# Bounds of the in-memory cache tier
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 256 * 1024  # 256 KB
+
+# SQLite file backing the persistent cache tier, shared by every app process on the host
+CACHE_DB_PATH = "scripts/weather_cache.db"
+
+# Entries older than this are deleted from the persistent cache tier (in seconds)
+CACHE_MAX_AGE = 24 * 3600  # 1 day
+
+# Two-tier cache storing weather data (in-memory LRU backed by SQLite)
+weather_cache = WeatherCache(
+    max_entries=CACHE_MAX_ENTRIES,
+    max_bytes=CACHE_MAX_BYTES,
+    db_path=CACHE_DB_PATH,
+    max_age=CACHE_MAX_AGE,
+)
+
+# How long failed lookups are remembered (in seconds). Unknown cities are remembered much longer
+# than transient errors, so an outage is never mistaken for a city that does not exist.
+NOT_FOUND_EXPIRATION_TIME = 1800  # 30 minutes
+ERROR_EXPIRATION_TIME = 30
+NEGATIVE_CACHE_MAX_ENTRIES = 1024
+
+# Cache of failed lookups
+negative_cache = NegativeCache(
+    ttls={
+        NegativeCache.NOT_FOUND: NOT_FOUND_EXPIRATION_TIME,
+        NegativeCache.ERROR: ERROR_EXPIRATION_TIME,
+    },
+    max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+)
+
+# Deduplicates concurrent API requests for the same city
+weather_flight = SingleFlight()
+
+# Keeps API requests inside the key's quota, interactive searches first
+rate_limiter = RateLimiter()
+
+# Maximum time an interactive search waits for the rate limiter (in seconds)
+INTERACTIVE_RATE_LIMIT_TIMEOUT = 10
+
+# Runs background refreshes of stale cache entries
+refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="weather-refresh")
+stale_served = 0
+_stale_served_lock = threading.Lock()
+
+# Queued or running background refreshes, by cache key: a city is refreshed once however often it is served stale
+_refresh_pending = {}
+_refresh_lock = threading.Lock()
+
+# Number of successful interactive get_weather calls per normalized city name, used to decide what
+# to prefetch. Counts are halved every LOOKUP_COUNTS_DECAY_INTERVAL, so cities nobody looks up
+# anymore drop out, and only the most looked up LOOKUP_COUNTS_MAX_ENTRIES cities are kept.
+lookup_counts = Counter()
+_lookup_counts_lock = threading.Lock()
+_lookup_counts_decayed = time.time()
+LOOKUP_COUNTS_MAX_ENTRIES = 1024
+LOOKUP_COUNTS_DECAY_INTERVAL = 6 * 3600  # 6 hours
+
+# Maximum number of city IDs the group endpoint accepts per request
+GROUP_REQUEST_LIMIT = 20
+
+# Maximum number of single requests running at the same time when batching is not possible
+BATCH_MAX_WORKERS = 4
+
+# Cities known to the offline gazetteer are cached under their city ID with this prefix, so that
+# every spelling and alias of a city shares one cache entry
+CITY_ID_KEY_PREFIX = "id:"
+
+# Once the gazetteer has been built, names it does not know are rejected without any request
+REJECT_UNKNOWN_CITIES = True
+
+# Coordinate lookups are served from the cached weather of any city within this distance (in km)
+COORDINATE_REUSE_DISTANCE = 10
+
+# Locations of the cities in the weather cache, by cache key
+cached_locations = GeoGrid()
+
+# Set once cached_locations has been filled from the disk tier of the cache
+cached_locations_seeded = False
+_seed_lock = threading.Lock()
+
+# Coordinate lookups are cached under this prefix followed by the rounded location
+COORDINATE_KEY_PREFIX = "coord:"
+
+# Forecasts are cached next to current conditions, under the city name with this prefix
+FORECAST_CACHE_PREFIX = "forecast:"
+
+# Define the expiration time for the cached forecasts (in seconds). The API updates them every 3 hours.
+FORECAST_EXPIRATION_TIME = 3 * 3600
+
+def rate_limited_get(url, priority=INTERACTIVE):
+    """
+    Sends a request to the weather API once the rate limiter allows it.
+
+    Args:
+        url (str): URL to request.
+        priority (int): INTERACTIVE or BACKGROUND.
+
+    Returns:
+        requests.Response: Response object.
+
+    Raises:
+        RateLimitExceeded: If the quota does not allow the request in time.
+    """
+    timeout = INTERACTIVE_RATE_LIMIT_TIMEOUT if priority == INTERACTIVE else None
+    rate_limiter.acquire(priority, timeout=timeout)
+
+    with metrics.timer("http_request"):
+        response = http_client.get(url)
+    metrics.increment("http_requests")
+    if response.status_code == 429:
+        rate_limiter.throttle(parse_retry_after(response.headers.get('Retry-After')))
+    return response
+
+def city_query(city_name, city_id=None):
+    """
+    Returns the query parameter selecting a city: its ID when known, its name otherwise.
+    """
+    if city_id is not None:
+        return f"id={city_id}"
+    # Stray whitespace ("los  angeles , us") is dropped, as it is from the cache key
+    parts = (" ".join(part.split()) for part in city_name.split(","))
+    return f"q={','.join(part for part in parts if part)}"
+
+def make_weather_api_request(city_name, priority=INTERACTIVE, city_id=None):
     """
     Makes a request to the weather API and returns the response data.
 
     Args:
         city_name (str): Name of the city to fetch weather data for.
+        priority (int): INTERACTIVE or BACKGROUND.
+        city_id (int): City ID, used instead of the name when known.
+
+    Returns:
+        requests.Response: Response object containing the weather data.
+    """
+
+    # No units parameter: temperatures come in kelvin and are converted locally
+    url = f"{API_BASE_URL}/data/2.5/weather?{city_query(city_name, city_id)}&APPID={API_KEY}"
+    response = rate_limited_get(url, priority)
+    return response
+
+def make_group_weather_api_request(city_ids, priority=BACKGROUND):
+    """
+    Makes a single request to the weather API for several cities, identified by their city IDs.
+
+    Args:
+        city_ids (list): City IDs, at most GROUP_REQUEST_LIMIT of them.
+        priority (int): INTERACTIVE or BACKGROUND.
+
+    Returns:
+        requests.Response: Response object containing a list of weather data.
+    """
+
+    ids = ",".join(str(city_id) for city_id in city_ids)
+    url = f"{API_BASE_URL}/data/2.5/group?id={ids}&APPID={API_KEY}"
+    response = rate_limited_get(url, priority)
+    return response
+
+def make_coordinate_weather_api_request(lat, lon, priority=INTERACTIVE):
+    """
+    Makes a request to the weather API for the city nearest to a location.
+
+    Args:
+        lat (float): Latitude, in degrees.
+        lon (float): Longitude, in degrees.
+        priority (int): INTERACTIVE or BACKGROUND.
 
     Returns:
         requests.Response: Response object containing the weather data.
     """
 
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city_name}&units=imperial&APPID={API_KEY}"
-    response = requests.get(url)
+    url = f"{API_BASE_URL}/data/2.5/weather?lat={lat}&lon={lon}&APPID={API_KEY}"
+    response = rate_limited_get(url, priority)
+    return response
+
+def make_forecast_api_request(city_name, priority=INTERACTIVE, city_id=None):
+    """
+    Makes a request to the 5-day/3-hour forecast endpoint of the weather API.
+
+    Args:
+        city_name (str): Name of the city to fetch the forecast for.
+        priority (int): INTERACTIVE or BACKGROUND.
+        city_id (int): City ID, used instead of the name when known.
+
+    Returns:
+        requests.Response: Response object containing the forecast data.
+    """
+
+    url = f"{API_BASE_URL}/data/2.5/forecast?{city_query(city_name, city_id)}&APPID={API_KEY}"
+    response = rate_limited_get(url, priority)
     return response
 
 def handle_weather_response(response, city_name):
@@ -36,19 +232,18 @@ def handle_weather_response(response, city_name):
         city_name (str): Name of the city.
 
     Returns:
-        tuple: A tuple containing the weather and temperature.
+        WeatherRecord: The weather of the city, or None if the response holds no weather data.
     """
 
     try:
         response.raise_for_status()
-        weather_json = response.json()
+        with metrics.timer("json_parse"):
+            weather_json = decode_json(response.content)
 
         if weather_json['cod'] == '404':
             raise CityNotFoundError(f"City weather not found: {city_name}")
 
-        weather = weather_json['weather'][0]['main']
-        temp = round(weather_json['main']['temp'])
-        return weather, temp
+        return WeatherRecord.from_json(weather_json, time.time())
 
     except requests.exceptions.RequestException as e:
         print(f"An error occurred while fetching weather data: {e}")
@@ -56,6 +251,9 @@ def handle_weather_response(response, city_name):
     except CityNotFoundError as e:
         print(e)
 
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        print(f"Unexpected weather data for {city_name}: {e}")
+
     return None
 
 def is_weather_data_expired(city_name):
@@ -68,14 +266,124 @@ def is_weather_data_expired(city_name):
     Returns:
         bool: True if the weather data has expired, False otherwise.
     """
-    if city_name in weather_cache:
-        cached_time = weather_cache[city_name]['time']
-        current_time = time.time()
-        return (current_time - cached_time) > CACHE_EXPIRATION_TIME
+    key, _ = resolve_city(city_name)
+    record = cached_record(key, weather_cache.peek) if key is not None else None
+    if record is not None:
+        return is_entry_expired(record)
     return True
 
 
-def get_weather(city_name):
+def is_entry_expired(record):
+    """
+    Checks if a cached weather record has expired.
+
+    Args:
+        record (WeatherRecord): Cached weather data.
+
+    Returns:
+        bool: True if the record is older than CACHE_EXPIRATION_TIME, False otherwise.
+    """
+    return (time.time() - record.time) > CACHE_EXPIRATION_TIME
+
+
+def is_entry_too_stale(record):
+    """
+    Checks if an expired cache record is too old to be served while it is refreshed.
+
+    Args:
+        record (WeatherRecord): Cached weather data.
+
+    Returns:
+        bool: True if the record is older than CACHE_EXPIRATION_TIME + MAX_STALE_TIME, False otherwise.
+    """
+    return (time.time() - record.time) > CACHE_EXPIRATION_TIME + MAX_STALE_TIME
+
+
+def refresh_weather(city_name):
+    """
+    Refreshes the cached weather data of a city in the background.
+
+    Args:
+        city_name (str): Normalized name of the city.
+
+    Returns:
+        concurrent.futures.Future: Future of the refreshed data, shared with a refresh already pending.
+    """
+    key, _ = resolve_city(city_name)
+    with _refresh_lock:
+        future = _refresh_pending.get(key)
+        if future is not None:
+            return future
+        future = refresh_executor.submit(weather_flight.do, key, fetch_weather, city_name, False, BACKGROUND)
+        _refresh_pending[key] = future
+    # Outside the lock: the callback runs right away if the refresh has already finished
+    future.add_done_callback(lambda done: _refresh_finished(key, done))
+    return future
+
+def _refresh_finished(key, future):
+    with _refresh_lock:
+        if _refresh_pending.get(key) is future:
+            del _refresh_pending[key]
+
+
+def resolve_city(city_name):
+    """
+    Returns the cache key of a city and its city ID, without any request.
+
+    Cities known to the offline gazetteer are keyed by their city ID, so every spelling and alias of
+    a city shares a cache entry. Names the gazetteer finds ambiguous are keyed by their normalized
+    form (see gazetteer.normalize()) and looked up by name, as are all names as long as the gazetteer
+    has not been built. Such a name has its own entry, separate from the ID entry its aliases and
+    qualified forms ("los angeles,us") share.
+
+    Args:
+        city_name (str): Name of the city.
+
+    Returns:
+        tuple: (key, city_id). city_id is None if the gazetteer does not know the city, and key is
+        None if the city is rejected as unknown.
+    """
+    city = city_gazetteer.lookup(city_name)
+    if city is not None and city[0] is not None:
+        return f"{CITY_ID_KEY_PREFIX}{city[0]}", city[0]
+    if city is None and REJECT_UNKNOWN_CITIES and city_gazetteer.available:
+        return None, None
+    return normalize(city_name), None
+
+
+def cached_record(key, lookup):
+    """
+    Returns the weather record cached under a key through a cache lookup function, ignoring entries
+    cached in an older format.
+
+    Args:
+        key (str): Cache key of the city, see resolve_city().
+        lookup (callable): weather_cache.get or weather_cache.peek.
+
+    Returns:
+        WeatherRecord: The cached record, or None.
+    """
+    record = lookup(key)
+    if not isinstance(record, WeatherRecord):
+        return None
+    return record
+
+def is_city_not_found(city_name):
+    """
+    Tells whether the last lookup of a city failed because the city does not exist, as opposed to a
+    network error or a rate limit rejection.
+
+    Args:
+        city_name (str): Name of the city.
+
+    Returns:
+        bool: True if the city is rejected as unknown or the weather API answered 404 for it.
+    """
+    key, _ = resolve_city(city_name)
+    return key is None or negative_cache.get(key) == NegativeCache.NOT_FOUND
+
+
+def get_weather(city_name, stale_while_revalidate=None, priority=INTERACTIVE):
     """
     Returns the weather and temperature for a given city.
 
@@ -83,39 +391,493 @@ def get_weather(city_name):
     - Handles the API response.
     - Adds the valid city to the list of valid cities.
     - Implements caching to avoid unnecessary API calls.
+    - Coalesces concurrent calls for the same city into a single API request.
+    - With stale-while-revalidate, returns recently expired data right away and refreshes it in the
+      background. is_entry_expired() tells such stale records apart.
+
+    The returned record is the cached one, shared by every caller: it must not be modified.
 
     Args:
         city_name (str): Name of the city.
+        stale_while_revalidate (bool): Serve recently expired data while refreshing it. Defaults to STALE_WHILE_REVALIDATE.
+        priority (int): Rate limiter priority of the API request, INTERACTIVE or BACKGROUND.
 
     Returns:
-        dict: A dictionary containing the weather and temperature information, or an empty dictionary if data retrieval fails.
+        WeatherRecord: The weather of the city, or None if data retrieval fails.
     """
+    global stale_served
+    if stale_while_revalidate is None:
+        stale_while_revalidate = STALE_WHILE_REVALIDATE
+
     # Convert city_name to lowercase for case-insensitive matching
     city_name = city_name.lower()
+
+    key, _ = resolve_city(city_name)
+    if key is None:
+        metrics.increment("unknown_city_rejections")
+        print(f"City weather not found: {city_name}")
+        return None
+
     # Check if weather data for the city is already cached and not expired
-    if not is_weather_data_expired(city_name) and city_name in weather_cache:
-        return {
-            'weather': weather_cache[city_name]['weather'],
-            'temperature': weather_cache[city_name]['temperature']
-            }
-
-    response = make_weather_api_request(city_name)
-    result = handle_weather_response(response, city_name)
-
-    if result is not None:
-        weather, temp = result
-        add_valid_city(city_name)
-
-        # Cache the weather data with current timestamp
-        weather_cache[city_name] = {
-            'weather': weather,
-            'temperature': temp,
-            'time': time.time()
-        }
-
-        return {
-            'weather': weather,
-            'temperature': temp
-        }
-
-    return {}
+    with metrics.timer("cache_lookup"):
+        record = cached_record(key, weather_cache.get)
+    if record is not None and not is_entry_expired(record):
+        metrics.increment("cache_hits")
+        count_lookup(city_name, priority)
+        return record
+    metrics.increment("cache_misses")
+
+    # Stale data is served even while the city's last refresh is remembered as failed: an outage
+    # must not hide data that is already cached. The refresh itself waits for the negative entry to expire.
+    if stale_while_revalidate and record is not None and not is_entry_too_stale(record):
+        with _stale_served_lock:
+            stale_served += 1
+        if negative_cache.get(key) is None:
+            refresh_weather(city_name)
+        count_lookup(city_name, priority)
+        return record
+
+    # Recently failed lookups are not retried until their negative cache entry expires
+    if negative_cache.get(key) is not None:
+        return None
+
+    # Concurrent callers for the same city share a single API request
+    record = weather_flight.do(key, fetch_weather, city_name, False, priority)
+    if record is not None:
+        count_lookup(city_name, priority)
+    return record
+
+def count_lookup(city_name, priority):
+    """
+    Counts a successful lookup of a city towards its popularity, see popular_cities().
+
+    Background lookups (batches, the dashboard) are not counted: they do not tell what users look up.
+
+    Args:
+        city_name (str): Normalized name of the city.
+        priority (int): Rate limiter priority of the lookup, INTERACTIVE or BACKGROUND.
+    """
+    if priority != INTERACTIVE:
+        return
+    with _lookup_counts_lock:
+        _decay_lookup_counts_locked()
+        lookup_counts[city_name] += 1
+        if len(lookup_counts) > LOOKUP_COUNTS_MAX_ENTRIES:
+            # Keep the most looked up half, so trimming only runs once per many new cities
+            kept = lookup_counts.most_common(LOOKUP_COUNTS_MAX_ENTRIES // 2)
+            lookup_counts.clear()
+            lookup_counts.update(dict(kept))
+
+def _decay_lookup_counts_locked():
+    """
+    Halves every count once per LOOKUP_COUNTS_DECAY_INTERVAL elapsed, dropping the counts that reach zero.
+    """
+    global _lookup_counts_decayed
+    halvings = int((time.time() - _lookup_counts_decayed) // LOOKUP_COUNTS_DECAY_INTERVAL)
+    if halvings <= 0:
+        return
+    _lookup_counts_decayed += halvings * LOOKUP_COUNTS_DECAY_INTERVAL
+    for city_name, count in list(lookup_counts.items()):
+        count >>= min(halvings, 63)
+        if count:
+            lookup_counts[city_name] = count
+        else:
+            del lookup_counts[city_name]
+
+def fetch_weather(city_name, force=False, priority=INTERACTIVE):
+    """
+    Fetches the weather and temperature for a city from the weather API and caches them.
+
+    Args:
+        city_name (str): Normalized name of the city.
+        force (bool): Fetch even if the cached data has not expired yet.
+        priority (int): Rate limiter priority of the API request, INTERACTIVE or BACKGROUND.
+
+    Returns:
+        WeatherRecord: The weather of the city, or None if data retrieval fails.
+    """
+    key, city_id = resolve_city(city_name)
+    if key is None:
+        return None
+
+    # Another caller may have filled the cache while this one was waiting to run
+    record = None if force else cached_record(key, weather_cache.peek)
+    if record is not None and not is_entry_expired(record):
+        return record
+
+    try:
+        response = make_weather_api_request(city_name, priority, city_id)
+    except RateLimitExceeded as e:
+        print(f"An error occurred while fetching weather data: {e}")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"An error occurred while fetching weather data: {e}")
+        negative_cache.set(key, NegativeCache.ERROR)
+        return None
+
+    record = handle_weather_response(response, city_name)
+
+    if record is not None:
+        # Aliases ("nyc") are stored as the name of the city they stand for
+        add_valid_city(city_gazetteer.canonical_name(city_name) or city_name)
+        cache_record(key, record)
+        negative_cache.discard(key)
+        return record
+
+    if response.status_code == 404:
+        negative_cache.set(key, NegativeCache.NOT_FOUND)
+    elif response.status_code != 429:
+        # 429 is handled by the rate limiter
+        negative_cache.set(key, NegativeCache.ERROR)
+    return None
+
+def cache_record(key, record, lat=None, lon=None):
+    """
+    Caches a weather record and indexes its location for coordinate lookups.
+
+    Args:
+        key (str): Cache key of the city, see resolve_city().
+        record (WeatherRecord): Weather of the city.
+        lat (float): Latitude to index the record at. Defaults to the city's.
+        lon (float): Longitude to index the record at. Defaults to the city's.
+    """
+    weather_cache[key] = record
+    if lat is None or lon is None:
+        lat, lon = record.lat, record.lon
+    if lat is not None and lon is not None:
+        cached_locations.add(key, lat, lon)
+
+def coordinate_key(lat, lon):
+    """
+    Returns the cache key of a coordinate lookup, rounded to about 1 km.
+    """
+    return f"{COORDINATE_KEY_PREFIX}{lat:.2f},{lon:.2f}"
+
+def seed_cached_locations():
+    """
+    Indexes the records of the disk tier of the cache for coordinate lookups, once per process, so
+    that cached cities can be reused right after a restart.
+    """
+    global cached_locations_seeded
+
+    with _seed_lock:
+        if cached_locations_seeded:
+            return
+        cached_locations_seeded = True
+
+        for key, entry in weather_cache.disk_entries():
+            if not isinstance(entry, WeatherRecord):
+                continue
+            if key.startswith(COORDINATE_KEY_PREFIX):
+                # Coordinate lookups are indexed at the queried location, kept in their key
+                try:
+                    lat, lon = (float(part) for part in key[len(COORDINATE_KEY_PREFIX):].split(","))
+                except ValueError:
+                    continue
+                cached_locations.add(key, lat, lon)
+            elif entry.lat is not None and entry.lon is not None:
+                cached_locations.add(key, entry.lat, entry.lon)
+
+def get_weather_at(lat, lon, max_distance=None, priority=INTERACTIVE):
+    """
+    Returns the weather at a location, e.g. for a request coming from a device.
+
+    - Serves the fresh cached weather of the nearest city within max_distance, without any request.
+    - Otherwise asks the weather API for the city nearest to the location and caches it under the
+      location, so that later lookups near the same point reuse it. When the offline gazetteer is
+      available, it is also cached under its city ID, where name lookups of that city find it too.
+
+    Args:
+        lat (float): Latitude, in degrees.
+        lon (float): Longitude, in degrees.
+        max_distance (float): Maximum distance in km of a cached city to reuse. Defaults to COORDINATE_REUSE_DISTANCE.
+        priority (int): Rate limiter priority of the API request, INTERACTIVE or BACKGROUND.
+
+    Returns:
+        WeatherRecord: The weather of the nearest city, or None if data retrieval fails.
+
+    Raises:
+        ValueError: If the coordinates are out of range.
+    """
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Invalid coordinates: {lat}, {lon}")
+    if max_distance is None:
+        max_distance = COORDINATE_REUSE_DISTANCE
+    if not cached_locations_seeded:
+        seed_cached_locations()
+
+    with metrics.timer("cache_lookup"):
+        for _, key in cached_locations.within(lat, lon, max_distance):
+            record = cached_record(key, weather_cache.get)
+            if record is None:
+                cached_locations.discard(key)
+            elif not is_entry_expired(record):
+                metrics.increment("coordinate_cache_hits")
+                return record
+    metrics.increment("coordinate_cache_misses")
+
+    # Nearby requests share a single API request
+    key = coordinate_key(lat, lon)
+    if negative_cache.get(key) is not None:
+        return None
+    return weather_flight.do(key, fetch_weather_at, lat, lon, key, priority)
+
+def fetch_weather_at(lat, lon, key, priority=INTERACTIVE):
+    """
+    Fetches the weather of the city nearest to a location from the weather API and caches it.
+
+    Args:
+        lat (float): Latitude, in degrees.
+        lon (float): Longitude, in degrees.
+        key (str): Cache key of the location, see coordinate_key().
+        priority (int): Rate limiter priority of the API request, INTERACTIVE or BACKGROUND.
+
+    Returns:
+        WeatherRecord: The weather of the nearest city, or None if data retrieval fails.
+    """
+    try:
+        response = make_coordinate_weather_api_request(lat, lon, priority)
+    except RateLimitExceeded as e:
+        print(f"An error occurred while fetching weather data: {e}")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"An error occurred while fetching weather data: {e}")
+        negative_cache.set(key, NegativeCache.ERROR)
+        return None
+
+    record = handle_weather_response(response, f"{lat}, {lon}")
+    if record is None:
+        if response.status_code != 429:
+            negative_cache.set(key, NegativeCache.ERROR)
+        return None
+
+    # Indexed at the queried location: the nearest city may be farther than the reuse distance
+    cache_record(key, record, lat, lon)
+    # Name lookups only read ID keys once the gazetteer is available, see resolve_city()
+    if record.city_id and city_gazetteer.available:
+        cache_record(f"{CITY_ID_KEY_PREFIX}{record.city_id}", record)
+    return record
+
+def get_weather_many(city_names, priority=BACKGROUND):
+    """
+    Returns the weather and temperature for several cities, using as few API requests as possible.
+
+    - Serves fresh cached data without any request.
+    - Fetches cities whose city ID is known (from the gazetteer or earlier lookups) with the group
+      endpoint, up to GROUP_REQUEST_LIMIT cities per request.
+    - Falls back to concurrent single requests for the other cities or when a group request fails.
+
+    Args:
+        city_names (iterable): Names of the cities.
+        priority (int): Rate limiter priority of the API requests, INTERACTIVE or BACKGROUND.
+
+    Returns:
+        dict: Maps each city name as given to the WeatherRecord get_weather would return for it, or None.
+    """
+    results = {}
+    by_id = {}
+    singles = []
+
+    for name in city_names:
+        key, city_id = resolve_city(name)
+        if key is None:
+            results[name] = None
+            continue
+        record = cached_record(key, weather_cache.get)
+        if record is not None and not is_entry_expired(record):
+            results[name] = record
+            continue
+        if city_id is None and record is not None:
+            city_id = record.city_id
+        if city_id is not None:
+            by_id.setdefault(city_id, []).append((name, key))
+        else:
+            singles.append(name)
+
+    city_ids = list(by_id)
+    for start in range(0, len(city_ids), GROUP_REQUEST_LIMIT):
+        chunk = city_ids[start:start + GROUP_REQUEST_LIMIT]
+        try:
+            response = make_group_weather_api_request(chunk, priority)
+            response.raise_for_status()
+            with metrics.timer("json_parse"):
+                weather_list = decode_json(response.content)['list']
+        except (requests.exceptions.RequestException, RateLimitExceeded, ValueError, KeyError) as e:
+            print(f"An error occurred while fetching grouped weather data: {e}")
+            weather_list = []
+
+        now = time.time()
+        for weather_json in weather_list:
+            try:
+                record = WeatherRecord.from_json(weather_json, now)
+            except (KeyError, IndexError, TypeError, ValueError):
+                continue
+            for name, key in by_id.pop(record.city_id, []):
+                cache_record(key, record)
+                results[name] = record
+
+        # Cities missing from the group response are retried one by one
+        for city_id in chunk:
+            singles.extend(name for name, _ in by_id.pop(city_id, []))
+
+    if singles:
+        with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+            lookups = executor.map(lambda name: get_weather(name, priority=priority), singles)
+            for name, result in zip(singles, lookups):
+                results[name] = result
+
+    return results
+
+def iter_weather(city_names, concurrency=BATCH_MAX_WORKERS, priority=BACKGROUND):
+    """
+    Looks up the weather of many cities concurrently and yields the results as they complete.
+
+    At most concurrency lookups run at once and city names are consumed lazily, so an arbitrarily
+    long iterable (e.g. a file or stdin) never has to be held in memory. Every lookup goes through
+    the shared cache, single-flight and rate limiter.
+
+    Args:
+        city_names (iterable): Names of the cities.
+        concurrency (int): Maximum number of lookups running at the same time.
+        priority (int): Rate limiter priority of the API requests, INTERACTIVE or BACKGROUND.
+
+    Yields:
+        tuple: (city_name, record, elapsed) where record is the WeatherRecord get_weather returned, or
+        None if the lookup failed, and elapsed is the lookup time in seconds.
+    """
+    def lookup(city_name):
+        start = time.perf_counter()
+        try:
+            result = get_weather(city_name, priority=priority)
+        except Exception as e:
+            print(f"An error occurred while fetching weather data for {city_name}: {e}")
+            result = None
+        return city_name, result, time.perf_counter() - start
+
+    names = iter(city_names)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="weather-batch") as executor:
+        pending = set()
+        for city_name in names:
+            pending.add(executor.submit(lookup, city_name))
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def get_forecast(city_name, priority=INTERACTIVE):
+    """
+    Returns the 5-day/3-hour forecast for a given city.
+
+    Forecasts are cached in the weather cache next to current conditions and concurrent calls for
+    the same city share a single API request.
+
+    Args:
+        city_name (str): Name of the city.
+        priority (int): Rate limiter priority of the API request, INTERACTIVE or BACKGROUND.
+
+    Returns:
+        ForecastSeries: The forecast, or None if data retrieval fails.
+    """
+    city_name = city_name.lower()
+    city_key, _ = resolve_city(city_name)
+    if city_key is None:
+        return None
+    key = FORECAST_CACHE_PREFIX + city_key
+
+    with metrics.timer("cache_lookup"):
+        entry = weather_cache.get(key)
+    if entry is not None and not is_forecast_expired(entry):
+        return ForecastSeries.from_entry(entry)
+
+    # Cities that just failed a weather lookup are not retried for their forecast either
+    if negative_cache.get(city_key) is not None:
+        return None
+
+    return weather_flight.do(key, fetch_forecast, city_name, priority)
+
+def fetch_forecast(city_name, priority=INTERACTIVE):
+    """
+    Fetches the forecast for a city from the weather API and caches it.
+
+    Args:
+        city_name (str): Normalized name of the city.
+        priority (int): Rate limiter priority of the API request, INTERACTIVE or BACKGROUND.
+
+    Returns:
+        ForecastSeries: The forecast, or None if data retrieval fails.
+    """
+    city_key, city_id = resolve_city(city_name)
+    if city_key is None:
+        return None
+    key = FORECAST_CACHE_PREFIX + city_key
+
+    # Another caller may have filled the cache while this one was waiting to run
+    entry = weather_cache.peek(key)
+    if entry is not None and not is_forecast_expired(entry):
+        return ForecastSeries.from_entry(entry)
+
+    try:
+        response = make_forecast_api_request(city_name, priority, city_id)
+        response.raise_for_status()
+        with metrics.timer("json_parse"):
+            forecast_json = decode_json(response.content)
+        series = ForecastSeries.from_json(forecast_json)
+    except (requests.exceptions.RequestException, RateLimitExceeded, ValueError, KeyError, TypeError) as e:
+        print(f"An error occurred while fetching forecast data: {e}")
+        return None
+
+    entry = series.to_entry()
+    entry['time'] = time.time()
+    weather_cache[key] = entry
+    return series
+
+def is_forecast_expired(entry):
+    """
+    Checks if a cached forecast has expired.
+
+    Args:
+        entry (dict): Cached forecast, including its 'time' key.
+
+    Returns:
+        bool: True if the forecast is older than FORECAST_EXPIRATION_TIME, False otherwise.
+    """
+    return (time.time() - entry['time']) > FORECAST_EXPIRATION_TIME
+
+def popular_cities(count):
+    """
+    Returns the cities users looked up most often recently.
+
+    Args:
+        count (int): Maximum number of cities to return.
+
+    Returns:
+        list: Normalized city names, most popular first.
+    """
+    with _lookup_counts_lock:
+        _decay_lookup_counts_locked()
+        return [city_name for city_name, _ in lookup_counts.most_common(count)]
+
+def get_weather_stats():
+    """
+    Returns counters describing the weather lookups made so far.
+
+    Returns:
+        dict: Cache counters plus the number of API fetches started and of calls coalesced into them.
+    """
+    stats = weather_cache.stats()
+    stats['fetches'] = weather_flight.calls
+    stats['coalesced'] = weather_flight.coalesced
+    stats['in_flight'] = weather_flight.in_flight()
+    stats['stale_served'] = stale_served
+    stats['refreshes_pending'] = len(_refresh_pending)
+    stats['cached_locations'] = len(cached_locations)
+    stats.update(negative_cache.stats())
+    stats.update(rate_limiter.stats())
+    return stats
+
+metrics.register_collector(get_weather_stats)
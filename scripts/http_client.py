@@ -0,0 +1,162 @@
+import socket
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Host of the weather API, used for pre-warming
+API_HOST = "api.openweathermap.org"
+
+# Timeouts in seconds for establishing a connection and for waiting on the response
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+# Size of the connection pool kept per host
+POOL_MAXSIZE = 4
+
+# Timings of the most recent requests, newest last
+request_timings = deque(maxlen=256)
+
+_session = None
+_session_lock = threading.Lock()
+_local = threading.local()
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    """
+    HTTPS connection that records how long connection setup takes.
+
+    'connect' covers name resolution and the TCP handshake, 'tls' covers the TLS handshake.
+    The timings are stored for the calling thread so that get() can attach them to the request that
+    opened the connection. Requests served by a pooled keep-alive connection record no setup time.
+    """
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        conn = super()._new_conn()
+        _local.connect = time.perf_counter() - start
+        return conn
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - start
+        _local.tls = max(total - (getattr(_local, "connect", None) or 0.0), 0.0)
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    Transport adapter whose HTTPS pools use TimedHTTPSConnection.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": HTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def get_session():
+    """
+    Returns the shared HTTP session, creating it on first use.
+
+    The session keeps connections alive and pools them per host, so only the first request to a host
+    pays for DNS, TCP and TLS setup.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = TimedHTTPAdapter(pool_connections=2, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get(url, timeout=None):
+    """
+    Sends a GET request through the shared session and records its timing.
+
+    Args:
+        url (str): URL to request.
+        timeout (tuple): (connect, read) timeouts in seconds. Defaults to (CONNECT_TIMEOUT, READ_TIMEOUT).
+
+    Returns:
+        requests.Response: Response object.
+    """
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+    _local.connect = None
+    _local.tls = None
+    start = time.perf_counter()
+    response = get_session().get(url, timeout=timeout)
+    total = time.perf_counter() - start
+
+    request_timings.append({
+        'url': url.split("?", 1)[0],
+        'status': response.status_code,
+        'connect': _local.connect,
+        'tls': _local.tls,
+        'ttfb': response.elapsed.total_seconds(),
+        'total': total,
+    })
+    return response
+
+
+def prewarm(host=API_HOST, background=True):
+    """
+    Opens a pooled connection to a host ahead of the first real request.
+
+    Resolves the host name (recording the DNS time) and sends a HEAD request so the TCP and TLS
+    handshakes are done and the connection is kept alive in the pool.
+
+    Args:
+        host (str): Host to connect to.
+        background (bool): Run in a daemon thread instead of blocking the caller.
+
+    Returns:
+        threading.Thread: The pre-warming thread, or None if it ran in the calling thread.
+    """
+    def warm():
+        _local.connect = None
+        _local.tls = None
+        try:
+            start = time.perf_counter()
+            socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+            dns = time.perf_counter() - start
+
+            get_session().head(f"https://{host}/", timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            request_timings.append({
+                'url': f"https://{host}/",
+                'status': None,
+                'dns': dns,
+                'connect': _local.connect,
+                'tls': _local.tls,
+                'ttfb': None,
+                'total': time.perf_counter() - start,
+            })
+        except (OSError, requests.exceptions.RequestException) as e:
+            print(f"Could not pre-warm connection to {host}: {e}")
+
+    if not background:
+        warm()
+        return None
+
+    thread = threading.Thread(target=warm, name="http-prewarm", daemon=True)
+    thread.start()
+    return thread
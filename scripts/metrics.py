@@ -0,0 +1,252 @@
+import os
+import threading
+import time
+from collections import deque
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "weather_"
+
+# Upper bounds of the latency histogram buckets (in seconds)
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Number of recent samples kept per histogram to compute percentiles
+PERCENTILE_WINDOW = 1024
+
+# Port of the local metrics endpoint started by the app, 0 for none
+METRICS_PORT = int(os.environ.get("WEATHER_METRICS_PORT", "0"))
+
+# Metrics are off unless enabled here, through WEATHER_METRICS=1, or with enable()
+enabled = os.environ.get("WEATHER_METRICS", "") not in ("", "0")
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_collectors = []
+
+
+class Histogram:
+    """
+    Latency histogram with cumulative buckets, plus a window of recent samples for percentiles.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, window=PERCENTILE_WINDOW):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.recent = deque(maxlen=window)
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentile(self, fraction):
+        """
+        Returns a percentile of the recent samples, or None if there are none.
+
+        Args:
+            fraction (float): Percentile as a fraction, e.g. 0.95.
+        """
+        samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+class _Timer:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def enable(on=True):
+    """
+    Turns metrics collection on or off.
+    """
+    global enabled
+    enabled = on
+
+
+def timer(name):
+    """
+    Returns a context manager timing its block into the histogram called name.
+
+    When metrics are disabled the same do-nothing context manager is returned every time.
+
+    Args:
+        name (str): Name of the histogram, e.g. "http_request".
+    """
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(name)
+
+
+def observe(name, value):
+    """
+    Records a sample in the histogram called name.
+    """
+    if not enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(value)
+
+
+def increment(name, amount=1):
+    """
+    Adds amount to the counter called name.
+    """
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def register_collector(collector):
+    """
+    Registers a function returning a dict of gauge values, read at export time.
+
+    Args:
+        collector (callable): Returns a dict mapping metric names to numbers.
+    """
+    _collectors.append(collector)
+
+
+def percentiles(name):
+    """
+    Returns the p50 and p95 of a histogram's recent samples.
+
+    Returns:
+        tuple: (p50, p95) in seconds, or (None, None) if the histogram has no samples.
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            return None, None
+        return histogram.percentile(0.5), histogram.percentile(0.95)
+
+
+def gauges():
+    """
+    Returns the current values of every registered collector.
+    """
+    values = {}
+    for collector in _collectors:
+        try:
+            values.update(collector())
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+    return values
+
+
+def export_prometheus():
+    """
+    Returns every metric in the Prometheus text exposition format.
+
+    Returns:
+        str: The exported metrics.
+    """
+    lines = []
+    with _lock:
+        for name, value in sorted(_counters.items()):
+            metric = f"{METRIC_PREFIX}{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        for name, histogram in sorted(_histograms.items()):
+            metric = f"{METRIC_PREFIX}{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum {histogram.total}")
+            lines.append(f"{metric}_count {histogram.count}")
+
+    for name, value in sorted(gauges().items()):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        metric = f"{METRIC_PREFIX}{name}"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    """
+    Writes the exported metrics to a file, e.g. for the node exporter's textfile collector.
+
+    The file is replaced atomically so a scraper never reads a partial file.
+
+    Args:
+        path (str): Destination file.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as writing:
+        writing.write(export_prometheus())
+    os.replace(temp_path, path)
+
+
+def serve(port=9464, host="127.0.0.1"):
+    """
+    Serves the exported metrics over HTTP from a daemon thread.
+
+    Args:
+        port (int): Port to listen on.
+        host (str): Address to bind, local only by default.
+
+    Returns:
+        ThreadingHTTPServer: The running server.
+    """
+    # Imported here to keep http.server out of the app's startup path
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            data = export_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,124 @@
+import threading
+import time
+from scripts import get_weather as weather
+from scripts.city_registry import city_registry
+from scripts.rate_limiter import BACKGROUND
+
+# Number of most searched cities kept warm
+PREFETCH_TOP_K = 30
+
+# How long before its expiration a cache entry is refreshed (in seconds)
+PREFETCH_LEAD_TIME = 300  # 5 minutes
+
+# Minimum delay between two prefetch requests, to stay well inside the API quota (in seconds)
+PREFETCH_MIN_INTERVAL = 2.0
+
+# Delay between two checks for entries that are about to expire (in seconds)
+PREFETCH_CHECK_INTERVAL = 60
+
+
+class PrefetchScheduler:
+    """
+    Keeps the most frequently searched cities warm in the weather cache.
+
+    A daemon thread periodically looks at the top PREFETCH_TOP_K cities by lookup count and refreshes
+    those whose cache entries expire within PREFETCH_LEAD_TIME, soonest first. Requests are spaced by
+    at least PREFETCH_MIN_INTERVAL so a burst of expirations never eats into the API quota at once.
+    Nothing runs on the Tk thread.
+    """
+
+    def __init__(
+        self,
+        top_k=PREFETCH_TOP_K,
+        lead_time=PREFETCH_LEAD_TIME,
+        min_interval=PREFETCH_MIN_INTERVAL,
+        check_interval=PREFETCH_CHECK_INTERVAL,
+    ):
+        """
+        Args:
+            top_k (int): Number of most searched cities kept warm.
+            lead_time (float): How long before its expiration an entry is refreshed, in seconds.
+            min_interval (float): Minimum delay between two prefetch requests, in seconds.
+            check_interval (float): Delay between two checks for entries about to expire, in seconds.
+        """
+        self.top_k = top_k
+        self.lead_time = lead_time
+        self.min_interval = min_interval
+        self.check_interval = check_interval
+        self.prefetched = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def due_cities(self):
+        """
+        Returns the popular cities whose cache entries expire within the lead time.
+
+        Only cities that are cached already and listed in the valid cities file are considered.
+
+        Returns:
+            list: Normalized city names, the ones expiring soonest first.
+        """
+        now = time.time()
+        due = []
+        for city_name in weather.popular_cities(self.top_k):
+            if city_name not in city_registry:
+                continue
+            key, _ = weather.resolve_city(city_name)
+            record = weather.cached_record(key, weather.weather_cache.peek) if key is not None else None
+            if record is None:
+                continue
+            expires_at = record.time + weather.CACHE_EXPIRATION_TIME
+            if expires_at - now <= self.lead_time:
+                due.append((expires_at, city_name))
+
+        due.sort()
+        return [city_name for _, city_name in due]
+
+    def prefetch(self, city_name):
+        """
+        Refreshes the cached weather data of a city, sharing any fetch already in flight for it.
+
+        Args:
+            city_name (str): Normalized name of the city.
+        """
+        key, _ = weather.resolve_city(city_name)
+        weather.weather_flight.do(key, weather.fetch_weather, city_name, True, BACKGROUND)
+        self.prefetched += 1
+
+    def run_once(self):
+        """
+        Refreshes every city that is due, spacing the requests by min_interval.
+        """
+        for city_name in self.due_cities():
+            if self._stop.is_set():
+                return
+            try:
+                self.prefetch(city_name)
+            except Exception as e:
+                print(f"Could not prefetch weather data for {city_name}: {e}")
+            self._stop.wait(self.min_interval)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.check_interval)
+
+    def start(self):
+        """
+        Starts the scheduler in a daemon thread.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """
+        Stops the scheduler after the request in progress, if any.
+        """
+        self._stop.set()
+
+
+# Shared prefetch scheduler
+prefetch_scheduler = PrefetchScheduler()
@@ -0,0 +1,185 @@
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Priority classes. Interactive searches always go before background refresh traffic.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Quota of the API key
+REQUESTS_PER_MINUTE = 60
+REQUESTS_PER_DAY = 30000
+
+# Share of the per-minute bucket background traffic may not use, kept for interactive searches
+BACKGROUND_RESERVE = 0.25
+
+# Wait used after a 429 response without a usable Retry-After header (in seconds)
+DEFAULT_RETRY_AFTER = 60
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def parse_retry_after(value, default=DEFAULT_RETRY_AFTER):
+    """
+    Parses a Retry-After header.
+
+    Args:
+        value (str): Header value, either a number of seconds or an HTTP date.
+        default (float): Value returned when the header is missing or invalid.
+
+    Returns:
+        float: Number of seconds to wait.
+    """
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """
+    Client-side token bucket enforcing the API key's per-minute and per-day quota.
+
+    - The per-minute bucket refills continuously. Background callers cannot take the last
+      BACKGROUND_RESERVE share of it and always wait while an interactive caller is waiting.
+    - The per-day count resets at midnight UTC.
+    - After a 429 response, throttle() blocks every caller until the server's Retry-After has passed.
+    """
+
+    def __init__(
+        self,
+        per_minute=REQUESTS_PER_MINUTE,
+        per_day=REQUESTS_PER_DAY,
+        background_reserve=BACKGROUND_RESERVE,
+    ):
+        """
+        Args:
+            per_minute (int): Requests allowed per minute.
+            per_day (int): Requests allowed per day.
+            background_reserve (float): Share of the per-minute bucket kept for interactive requests.
+        """
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.background_floor = per_minute * background_reserve
+
+        self._condition = threading.Condition()
+        self._tokens = float(per_minute)
+        self._refilled_at = time.monotonic()
+        self._day = self._today()
+        self._used_today = 0
+        self._blocked_until = 0.0
+        self._waiting = [0, 0]
+
+        self.granted = [0, 0]
+        self.rejected = 0
+        self.throttled = 0
+
+    @staticmethod
+    def _today():
+        return datetime.now(timezone.utc).date()
+
+    def _refill(self, now):
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._tokens = min(self.per_minute, self._tokens + elapsed * self.per_minute / 60.0)
+
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._used_today = 0
+
+    def _wait_time(self, priority, now):
+        """
+        Returns how long a caller must wait before it can take a token, or 0 if it can take one now.
+        """
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        floor = self.background_floor if priority == BACKGROUND else 0.0
+        if priority == BACKGROUND and self._waiting[INTERACTIVE]:
+            return 0.05
+        if self._tokens >= floor + 1:
+            return 0.0
+        return (floor + 1 - self._tokens) * 60.0 / self.per_minute
+
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        """
+        Takes a token, waiting until one is available for the given priority.
+
+        Args:
+            priority (int): INTERACTIVE or BACKGROUND.
+            timeout (float): Maximum time to wait in seconds, or None to wait as long as needed.
+
+        Raises:
+            RateLimitExceeded: If the daily quota is used up or no token became available in time.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._used_today >= self.per_day:
+                        self.rejected += 1
+                        raise RateLimitExceeded("Daily API quota used up")
+
+                    wait = self._wait_time(priority, now)
+                    if wait <= 0:
+                        self._tokens -= 1
+                        self._used_today += 1
+                        self.granted[priority] += 1
+                        return
+
+                    if deadline is not None:
+                        if now + wait > deadline:
+                            self.rejected += 1
+                            raise RateLimitExceeded("No API request available within the timeout")
+                    self._condition.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def throttle(self, retry_after):
+        """
+        Blocks every caller for a while, after the server answered 429 Too Many Requests.
+
+        Args:
+            retry_after (float): Number of seconds to wait.
+        """
+        with self._condition:
+            self.throttled += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self._tokens = 0.0
+
+    def stats(self):
+        """
+        Returns the remaining quota and the limiter counters.
+
+        Returns:
+            dict: Remaining requests this minute and today, throttling state and counters.
+        """
+        with self._condition:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                'remaining_minute': int(self._tokens),
+                'remaining_day': self.per_day - self._used_today,
+                'throttled_for': max(self._blocked_until - now, 0.0),
+                'granted_interactive': self.granted[INTERACTIVE],
+                'granted_background': self.granted[BACKGROUND],
+                'rejected': self.rejected,
+                'throttled': self.throttled,
+            }
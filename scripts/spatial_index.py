@@ -0,0 +1,149 @@
+import math
+import threading
+
+# Mean radius of the Earth, in km
+EARTH_RADIUS_KM = 6371.0088
+
+# Length of one degree of latitude, in km
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """
+    Returns the great-circle distance between two points, in km.
+
+    Args:
+        lat1 (float): Latitude of the first point, in degrees.
+        lon1 (float): Longitude of the first point, in degrees.
+        lat2 (float): Latitude of the second point, in degrees.
+        lon2 (float): Longitude of the second point, in degrees.
+    """
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GeoGrid:
+    """
+    Spatial index of items by latitude and longitude, bucketed into a grid of fixed-size cells.
+
+    A radius query only visits the cells overlapping the circle's bounding box, so with cells about
+    as large as typical radii it checks a handful of cells whatever the number of items. Longitudes
+    wrap around the antimeridian, and a circle reaching a pole visits every column of its rows.
+
+    Each item has one location: adding it again moves it.
+    """
+
+    def __init__(self, cell_size=0.25):
+        """
+        Args:
+            cell_size (float): Size of a cell, in degrees (0.25° is about 28 km of latitude).
+        """
+        self.cell_size = cell_size
+        self.columns = math.ceil(360 / cell_size)
+        self._cells = {}
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def _cell(self, lat, lon):
+        row = math.floor(lat / self.cell_size)
+        column = math.floor(((lon + 180) % 360) / self.cell_size) % self.columns
+        return row, column
+
+    def add(self, item, lat, lon):
+        """
+        Indexes an item at a location, replacing its previous location.
+
+        Args:
+            item (hashable): Item to index, e.g. a cache key.
+            lat (float): Latitude, in degrees.
+            lon (float): Longitude, in degrees.
+        """
+        cell = self._cell(lat, lon)
+        with self._lock:
+            self._remove(item)
+            self._items[item] = (lat, lon, cell)
+            self._cells.setdefault(cell, {})[item] = (lat, lon)
+
+    def discard(self, item):
+        """
+        Removes an item from the index, if it is indexed.
+        """
+        with self._lock:
+            self._remove(item)
+
+    def _remove(self, item):
+        location = self._items.pop(item, None)
+        if location is None:
+            return
+        cell = location[2]
+        items = self._cells[cell]
+        del items[item]
+        if not items:
+            del self._cells[cell]
+
+    def within(self, lat, lon, radius):
+        """
+        Returns the items within a distance of a point, nearest first.
+
+        Args:
+            lat (float): Latitude of the point, in degrees.
+            lon (float): Longitude of the point, in degrees.
+            radius (float): Maximum distance, in km.
+
+        Returns:
+            list: (distance, item) pairs, distances in km.
+        """
+        size = self.cell_size
+        center_row, center_column = self._cell(lat, lon)
+        row_span = math.ceil(radius / (KM_PER_DEGREE * size))
+
+        # Widest longitude extent of the circle; every column once it reaches a pole
+        angle = radius / EARTH_RADIUS_KM
+        if angle >= math.radians(90 - abs(lat)):
+            column_span = None
+        else:
+            extent = math.degrees(math.asin(min(1.0, math.sin(angle) / math.cos(math.radians(lat)))))
+            column_span = math.ceil(extent / size) + 1
+            if 2 * column_span + 1 >= self.columns:
+                column_span = None
+        if column_span is None:
+            columns = range(self.columns)
+        else:
+            columns = [
+                (center_column + offset) % self.columns
+                for offset in range(-column_span, column_span + 1)
+            ]
+
+        found = []
+        with self._lock:
+            for row in range(center_row - row_span, center_row + row_span + 1):
+                for column in columns:
+                    items = self._cells.get((row, column))
+                    if not items:
+                        continue
+                    for item, (item_lat, item_lon) in items.items():
+                        distance = haversine(lat, lon, item_lat, item_lon)
+                        if distance <= radius:
+                            found.append((distance, item))
+
+        found.sort(key=lambda pair: pair[0])
+        return found
+
+    def nearest(self, lat, lon, radius):
+        """
+        Returns the item nearest to a point within a distance.
+
+        Returns:
+            tuple: (distance, item), or None if no item is within radius km.
+        """
+        found = self.within(lat, lon, radius)
+        return found[0] if found else None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
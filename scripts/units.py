@@ -0,0 +1,106 @@
+"""
+Temperature units.
+
+The weather cache stores temperatures in kelvin, as returned by the weather API without a units
+parameter. Every displayed value is converted locally, so switching units never refetches anything.
+"""
+import threading
+
+KELVIN = "kelvin"
+CELSIUS = "celsius"
+FAHRENHEIT = "fahrenheit"
+
+# Scale and offset converting kelvin to each unit
+_CONVERSIONS = {
+    KELVIN: (1.0, 0.0),
+    CELSIUS: (1.0, -273.15),
+    FAHRENHEIT: (1.8, -459.67),
+}
+
+SYMBOLS = {
+    KELVIN: "K",
+    CELSIUS: "°C",
+    FAHRENHEIT: "°F",
+}
+
+# Unit used when none is given
+display_unit = FAHRENHEIT
+
+_listeners = []
+_listeners_lock = threading.Lock()
+
+
+def convert(kelvin, unit=None, rounded=True):
+    """
+    Converts a temperature from kelvin.
+
+    Args:
+        kelvin (float): Temperature in kelvin.
+        unit (str): KELVIN, CELSIUS or FAHRENHEIT. Defaults to display_unit.
+        rounded (bool): Round the result to the nearest integer.
+
+    Returns:
+        float: The converted temperature (an int when rounded).
+    """
+    scale, offset = _CONVERSIONS[unit or display_unit]
+    value = kelvin * scale + offset
+    return round(value) if rounded else value
+
+
+def convert_many(kelvins, unit=None, rounded=True):
+    """
+    Converts many temperatures from kelvin in a single pass, e.g. every tile of a multi-city view.
+
+    Args:
+        kelvins (iterable): Temperatures in kelvin.
+        unit (str): KELVIN, CELSIUS or FAHRENHEIT. Defaults to display_unit.
+        rounded (bool): Round the results to the nearest integer.
+
+    Returns:
+        list: The converted temperatures, in order.
+    """
+    scale, offset = _CONVERSIONS[unit or display_unit]
+    if rounded:
+        return [round(kelvin * scale + offset) for kelvin in kelvins]
+    return [kelvin * scale + offset for kelvin in kelvins]
+
+
+def symbol(unit=None):
+    """
+    Returns the symbol of a unit, e.g. "°C". Defaults to display_unit.
+    """
+    return SYMBOLS[unit or display_unit]
+
+
+def set_display_unit(unit):
+    """
+    Changes the unit used for display and notifies the listeners if it changed.
+
+    Args:
+        unit (str): KELVIN, CELSIUS or FAHRENHEIT.
+    """
+    global display_unit
+    if unit not in _CONVERSIONS:
+        raise ValueError(f"Unknown temperature unit: {unit}")
+    if unit == display_unit:
+        return
+    display_unit = unit
+
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(unit)
+
+
+def add_listener(listener):
+    """
+    Registers a function called as listener(unit) whenever the display unit changes.
+    """
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
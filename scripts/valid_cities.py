@@ -1,3 +1,24 @@
+import atexit
+import os
+import tempfile
+import threading
+from scripts import metrics
+from scripts.city_registry import city_registry, VALID_CITIES_PATH
+
+# Number of pending cities that triggers an immediate write
+WRITE_BATCH_SIZE = 32
+
+# Maximum time a new city waits in memory before it is written (in seconds)
+WRITE_DELAY = 2.0
+
+# Number of lines appended since the last compaction that triggers a new compaction
+COMPACT_AFTER = 1000
+
+_pending = []
+_pending_lock = threading.Lock()
+_flush_timer = None
+_appended_since_compaction = 0
+
 
 def add_valid_city(city_name):
     """
@@ -9,16 +30,103 @@ def add_valid_city(city_name):
     Returns:
         None
     """
+    add_valid_cities([city_name])
+
+
+def add_valid_cities(city_names):
+    """
+    Adds several valid cities to the list of valid cities.
+
+    - Checks membership against the in-memory city registry instead of reading the file.
+    - New cities are added to the registry in one batch and written to the file in batches.
+
+    Args:
+        city_names (iterable): Names of the cities to add.
+
+    Returns:
+        list: The cities that were not known yet.
+    """
+    global _flush_timer
+    with _pending_lock:
+        added = city_registry.add_many(city_names)
+        for city_name in added:
+            print("Adding:", city_name, "to the valid cities file")
+        _pending.extend(added)
+
+        if len(_pending) >= WRITE_BATCH_SIZE:
+            _flush_locked()
+        elif _pending and _flush_timer is None:
+            _flush_timer = threading.Timer(WRITE_DELAY, flush_valid_cities)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+    return added
+
+
+def flush_valid_cities():
+    """
+    Writes pending cities to the 'valid_cities.txt' file with a single fsync'd append.
+    """
+    with _pending_lock:
+        _flush_locked()
+
+
+def _flush_locked():
+    global _flush_timer, _appended_since_compaction
+    if _flush_timer is not None:
+        _flush_timer.cancel()
+        _flush_timer = None
+    if not _pending:
+        return
+
+    data = "".join(city + "\n" for city in _pending)
+    with metrics.timer("city_file_io"), open(VALID_CITIES_PATH, 'a') as appending:
+        appending.write(data)
+        appending.flush()
+        os.fsync(appending.fileno())
+
+    _appended_since_compaction += len(_pending)
+    _pending.clear()
+
+    if _appended_since_compaction >= COMPACT_AFTER:
+        _compact_locked()
+
+
+def compact_valid_cities():
+    """
+    Rewrites the 'valid_cities.txt' file without blank lines and case-insensitive duplicates.
+
+    The new content is written to a temporary file that atomically replaces the old one.
+    """
+    with _pending_lock:
+        _flush_locked()
+        _compact_locked()
+
+
+def _compact_locked():
+    global _appended_since_compaction
+    seen = set()
     cities = []
-    with open("scripts/valid_cities.txt", 'r') as reading:
+    with open(VALID_CITIES_PATH, 'r') as reading:
         for line in reading:
-            cities.append(line.strip().lower())
+            city = line.strip()
+            if city and city.casefold() not in seen:
+                seen.add(city.casefold())
+                cities.append(city)
 
-    if city_name.lower() not in cities:
-        print("Adding:", city_name, "to the valid cities file")
-        with open("scripts/valid_cities.txt", 'a') as appending:
-            appending.write(city_name)
-            appending.write("\n")
+    directory = os.path.dirname(os.path.abspath(VALID_CITIES_PATH))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".valid_cities.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as writing:
+            writing.write("".join(city + "\n" for city in cities))
+            writing.flush()
+            os.fsync(writing.fileno())
+        os.replace(temp_path, VALID_CITIES_PATH)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    _appended_since_compaction = 0
 
 
 def get_valid_cities():
@@ -28,7 +136,7 @@ def get_valid_cities():
     Returns:
         list: A list of valid cities.
     """
-    with open("scripts/valid_cities.txt", 'r') as reading:
-        cities = [line.strip() for line in reading]
+    return list(city_registry.cities)
+
 
-    return cities
+atexit.register(flush_valid_cities)
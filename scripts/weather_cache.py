@@ -0,0 +1,398 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from scripts.weather_record import WeatherRecord, decode_json
+
+# Number of writes between two purges of old entries from the disk tier
+PURGE_INTERVAL_WRITES = 1000
+
+
+class WeatherCache:
+    """
+    Two-tier cache for weather data.
+
+    - A size-bounded LRU in memory, limited by entry count and by an approximate byte budget.
+    - A persistent SQLite store (WAL mode) that survives restarts and can be shared by several
+      app processes on the same host.
+
+    Entries are WeatherRecords or plain dictionaries, keyed by the normalized city name. Every entry
+    carries its fetch time (the record's time attribute or the dictionary's 'time' key) so the caller
+    can decide whether the data has expired. On disk, records are stored as compact JSON lists.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=256 * 1024, db_path=None, max_age=None):
+        """
+        Args:
+            max_entries (int): Maximum number of entries kept in memory.
+            max_bytes (int): Approximate maximum size in bytes of the entries kept in memory.
+            db_path (str): Path of the SQLite database file, or None to disable the disk tier.
+            max_age (float): Entries older than this many seconds are deleted from the disk tier when it
+                is opened and every PURGE_INTERVAL_WRITES writes. None keeps them forever.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.max_age = max_age
+
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        self._local = threading.local()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.corrupt = 0
+
+        self._purged = False
+        self._writes = 0
+
+    def _connection(self):
+        """
+        Returns the SQLite connection of the calling thread, opening it on first use.
+
+        Returns:
+            sqlite3.Connection: Connection to the disk tier, or None if the disk tier is disabled or unavailable.
+        """
+        if self.db_path is None:
+            return None
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            try:
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                connection = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS weather_cache ("
+                    "key TEXT PRIMARY KEY, data TEXT NOT NULL, time REAL NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                print(f"Weather cache database unavailable: {e}")
+                self.db_path = None
+                return None
+            self._local.connection = connection
+
+            # Purge once per process, when the disk tier is first opened
+            if not self._purged and self.max_age is not None:
+                self._purged = True
+                self.purge_older_than(self.max_age)
+
+        return connection
+
+    def _remember(self, key, entry, size):
+        """
+        Stores an entry in the in-memory tier and evicts least recently used entries over budget.
+        """
+        if key in self._entries:
+            self._total_bytes -= self._sizes.pop(key)
+            del self._entries[key]
+
+        self._entries[key] = entry
+        self._sizes[key] = size
+        self._total_bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            old_key, _ = self._entries.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def _load(self, key):
+        """
+        Reads an entry from the disk tier.
+
+        Returns:
+            tuple: The entry and its serialized size, or None if the key is not stored on disk.
+        """
+        connection = self._connection()
+        if connection is None:
+            return None
+
+        try:
+            row = connection.execute(
+                "SELECT data FROM weather_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Could not read from the weather cache database: {e}")
+            return None
+
+        if row is None:
+            return None
+        entry = self._decode(row[0])
+        if entry is None:
+            return None
+        return entry, len(row[0])
+
+    def _decode(self, data):
+        """
+        Decodes an entry of the disk tier.
+
+        Returns:
+            WeatherRecord | dict: The entry, or None if the row is corrupt or in an unknown format.
+        """
+        try:
+            entry = decode_json(data)
+            if isinstance(entry, list):
+                return WeatherRecord.from_list(entry)
+            if isinstance(entry, dict):
+                return entry
+        except (ValueError, TypeError) as e:
+            print(f"Ignoring unreadable weather cache entry: {e}")
+        self.corrupt += 1
+        return None
+
+    def get(self, key):
+        """
+        Returns the cached entry for a key, looking in memory first and then on disk.
+
+        Args:
+            key (str): Normalized city name.
+
+        Returns:
+            WeatherRecord | dict: The cached entry, or None if the key is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+            loaded = self._load(key)
+            if loaded is None:
+                self.misses += 1
+                return None
+
+            entry, size = loaded
+            self._remember(key, entry, size)
+            self.hits += 1
+            self.disk_hits += 1
+            return entry
+
+    def peek(self, key, disk=True):
+        """
+        Returns the cached entry for a key without updating recency or the hit/miss counters.
+
+        Args:
+            key (str): Normalized city name.
+            disk (bool): Also look in the disk tier if the key is not in memory.
+
+        Returns:
+            WeatherRecord | dict: The cached entry, or None if the key is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None or not disk:
+                return entry
+
+            loaded = self._load(key)
+            return loaded[0] if loaded is not None else None
+
+    def set(self, key, entry):
+        """
+        Stores an entry in both tiers.
+
+        Args:
+            key (str): Normalized city name.
+            entry (WeatherRecord | dict): Weather data. A dictionary must include its 'time' key.
+        """
+        if isinstance(entry, WeatherRecord):
+            data = json.dumps(entry.to_list())
+            entry_time = entry.time
+        else:
+            data = json.dumps(entry)
+            entry_time = entry.get('time', time.time())
+        with self._lock:
+            self._remember(key, entry, len(data))
+
+            connection = self._connection()
+            if connection is None:
+                return
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO weather_cache (key, data, time) VALUES (?, ?, ?)",
+                    (key, data, entry_time),
+                )
+            except sqlite3.Error as e:
+                print(f"Could not write to the weather cache database: {e}")
+                return
+
+            self._writes += 1
+            if self.max_age is not None and self._writes % PURGE_INTERVAL_WRITES == 0:
+                self.purge_older_than(self.max_age)
+
+    def disk_entries(self):
+        """
+        Returns every readable entry of the disk tier, e.g. to rebuild an index after a restart.
+
+        Returns:
+            list: (key, entry) pairs. Corrupt rows are skipped.
+        """
+        connection = self._connection()
+        if connection is None:
+            return []
+
+        try:
+            rows = connection.execute("SELECT key, data FROM weather_cache").fetchall()
+        except sqlite3.Error as e:
+            print(f"Could not read from the weather cache database: {e}")
+            return []
+
+        entries = []
+        for key, data in rows:
+            entry = self._decode(data)
+            if entry is not None:
+                entries.append((key, entry))
+        return entries
+
+    def purge_older_than(self, max_age):
+        """
+        Deletes entries older than max_age seconds from the disk tier.
+
+        Args:
+            max_age (float): Maximum age in seconds of the entries to keep.
+        """
+        connection = self._connection()
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "DELETE FROM weather_cache WHERE time < ?", (time.time() - max_age,)
+            )
+        except sqlite3.Error as e:
+            print(f"Could not purge the weather cache database: {e}")
+
+    def clear(self):
+        """
+        Empties the in-memory tier. The disk tier is left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: Hit, miss and eviction counts plus the current in-memory size.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'corrupt': self.corrupt,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
+
+    def __contains__(self, key):
+        return self.peek(key) is not None
+
+    def __getitem__(self, key):
+        entry = self.get(key)
+        if entry is None:
+            raise KeyError(key)
+        return entry
+
+    def __setitem__(self, key, entry):
+        self.set(key, entry)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class NegativeCache:
+    """
+    Bounded in-memory cache of failed lookups.
+
+    Each entry records why a lookup failed and expires after the TTL of its kind, so that an unknown
+    city can be remembered for a long time while a transient error is only remembered briefly.
+    """
+
+    NOT_FOUND = "not_found"
+    ERROR = "error"
+
+    def __init__(self, ttls, max_entries=1024):
+        """
+        Args:
+            ttls (dict): Maps each kind (NOT_FOUND, ERROR) to its time to live in seconds.
+            max_entries (int): Maximum number of entries kept.
+        """
+        self.ttls = ttls
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = {kind: 0 for kind in ttls}
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        Returns why the last lookup of a key failed, if that is still remembered.
+
+        Args:
+            key (str): Normalized city name.
+
+        Returns:
+            str: NOT_FOUND or ERROR, or None if the key has no live entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            kind, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+
+            self.hits[kind] += 1
+            return kind
+
+    def set(self, key, kind):
+        """
+        Remembers that the lookup of a key failed.
+
+        Args:
+            key (str): Normalized city name.
+            kind (str): NOT_FOUND or ERROR.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (kind, time.time() + self.ttls[kind])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        """
+        Returns the negative cache counters.
+
+        Returns:
+            dict: Hits per kind, evictions and the current number of entries.
+        """
+        with self._lock:
+            stats = {f'negative_{kind}_hits': hits for kind, hits in self.hits.items()}
+            stats['negative_evictions'] = self.evictions
+            stats['negative_entries'] = len(self._entries)
+            return stats
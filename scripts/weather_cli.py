@@ -0,0 +1,87 @@
+"""
+Command-line weather lookups, without the Tk interface.
+
+Reads city names (one per line) from files or stdin, looks them up with bounded concurrency through
+the shared weather cache and streams the results as JSON Lines or CSV as they complete:
+
+    python -m scripts.weather_cli cities.txt --concurrency 8 --format csv > weather.csv
+    cat cities.txt | python -m scripts.weather_cli > weather.jsonl
+"""
+import argparse
+import contextlib
+import csv
+import fileinput
+import json
+import sys
+import time
+from scripts import units
+from scripts.get_weather import BATCH_MAX_WORKERS, get_weather_stats, is_entry_expired, iter_weather
+
+CSV_FIELDS = ["city", "ok", "weather", "temperature", "stale", "elapsed_ms"]
+
+
+def read_city_names(paths):
+    """
+    Yields the non-blank lines of the given files, or of stdin if no file is given.
+
+    Args:
+        paths (list): Paths of the input files.
+    """
+    with fileinput.input(files=paths or ("-",)) as lines:
+        for line in lines:
+            city_name = line.strip()
+            if city_name:
+                yield city_name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up the weather of many cities.")
+    parser.add_argument("files", nargs="*", help="files with one city name per line (default: stdin)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_MAX_WORKERS,
+                        help="maximum number of lookups running at the same time")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format")
+    parser.add_argument("--units", choices=[units.FAHRENHEIT, units.CELSIUS, units.KELVIN],
+                        default=units.FAHRENHEIT, help="unit of the temperatures")
+    args = parser.parse_args(argv)
+
+    output = sys.stdout
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+
+    total = failed = 0
+    start = time.perf_counter()
+    # Progress messages from the weather pipeline go to stderr, results to stdout
+    with contextlib.redirect_stdout(sys.stderr):
+        for city_name, record, elapsed in iter_weather(read_city_names(args.files), args.concurrency):
+            total += 1
+            if record is None:
+                failed += 1
+            row = {
+                'city': city_name,
+                'ok': record is not None,
+                'weather': record.weather if record is not None else None,
+                'temperature': record.temperature(args.units) if record is not None else None,
+                'stale': record is not None and is_entry_expired(record),
+                'elapsed_ms': round(elapsed * 1000, 1),
+            }
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                output.write(json.dumps(row) + "\n")
+            output.flush()
+
+    duration = time.perf_counter() - start
+    stats = get_weather_stats()
+    print(
+        f"{total} cities in {duration:.2f} s ({total / duration if duration else 0:.1f}/s), "
+        f"{total - failed} ok, {failed} failed; "
+        f"cache hits {stats['hits']}, API fetches {stats['fetches']}, coalesced {stats['coalesced']}",
+        file=sys.stderr,
+    )
+    return 1 if failed and failed == total else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import json
+from scripts import units
+
+# orjson parses API responses several times faster than the standard library when it is installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def decode_json(data):
+    """
+    Parses a JSON document, with orjson when it is installed.
+
+    Args:
+        data (bytes | str): JSON document, e.g. the body of an API response.
+
+    Returns:
+        object: The decoded document.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class WeatherRecord:
+    """
+    Current weather of one city: the only fields the application uses.
+
+    Records are immutable once cached and are shared by every caller, so a cache hit returns the
+    cached record itself instead of a copy.
+    """
+
+    __slots__ = ("weather", "kelvin", "city_id", "time", "lat", "lon")
+
+    def __init__(self, weather, kelvin, city_id, time, lat=None, lon=None):
+        """
+        Args:
+            weather (str): Main weather condition, e.g. "Clear".
+            kelvin (float): Temperature in kelvin, unrounded.
+            city_id (int): City ID used by the weather API, or None if unknown.
+            time (float): When the data was fetched, in epoch seconds.
+            lat (float): Latitude of the city, or None if unknown.
+            lon (float): Longitude of the city, or None if unknown.
+        """
+        self.weather = weather
+        self.kelvin = kelvin
+        self.city_id = city_id
+        self.time = time
+        self.lat = lat
+        self.lon = lon
+
+    @classmethod
+    def from_json(cls, weather_json, time):
+        """
+        Builds a record from the weather data of one city, reading only the fields it keeps.
+
+        Args:
+            weather_json (dict): Weather data of one city, as returned by the weather API.
+            time (float): When the data was fetched, in epoch seconds.
+        """
+        coord = weather_json.get('coord') or {}
+        return cls(
+            weather_json['weather'][0]['main'],
+            float(weather_json['main']['temp']),
+            weather_json.get('id'),
+            time,
+            coord.get('lat'),
+            coord.get('lon'),
+        )
+
+    def temperature(self, unit=None):
+        """
+        Returns the temperature rounded in a unit from scripts.units. Defaults to units.display_unit.
+        """
+        return units.convert(self.kelvin, unit)
+
+    def as_dict(self, unit=None):
+        """
+        Returns the weather and temperature as a dictionary, for display.
+        """
+        return {
+            'weather': self.weather,
+            'temperature': self.temperature(unit)
+        }
+
+    def to_list(self):
+        """
+        Returns the record as a JSON-serializable list, its form in the disk tier of the cache.
+        """
+        return [self.weather, self.kelvin, self.city_id, self.time, self.lat, self.lon]
+
+    @classmethod
+    def from_list(cls, values):
+        # Records cached without coordinates have four values
+        return cls(*values)
+
+    def __repr__(self):
+        return (
+            f"WeatherRecord(weather={self.weather!r}, kelvin={self.kelvin!r}, "
+            f"city_id={self.city_id!r}, time={self.time!r}, lat={self.lat!r}, lon={self.lon!r})"
+        )